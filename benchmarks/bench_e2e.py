@@ -0,0 +1,390 @@
+"""
+Benchmark ponta a ponta das rotas FastAPI contra um Jira falso
+(tools.fake_jira) e um endpoint Databricks falso (tools.fake_databricks),
+cada um num subprocesso. Para cada rota mede tempo total, requisições feitas
+ao Jira e ao LLM, pico de RSS do processo da API e o tempo por estágio
+(descoberta de sprints, crawl/changelogs, métricas, prompt e LLM). O resultado
+sai em JSON, para comparar versões.
+
+Uso:
+    python -m benchmarks.bench_e2e --boards 50 --sprints 500 --issues 20000 --num-sprints 500 \
+        --jira-latency 0.01 --llm-latency 0.2 --output benchmarks/results/e2e.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(module: str, port: int, extra_args: list) -> subprocess.Popen:
+    """Sobe um dos servidores falsos e espera o `/stats` responder."""
+    process = subprocess.Popen(
+        [sys.executable, "-m", module, "--port", str(port), *extra_args],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise Exception(f"Erro ao subir {module}: {process.stderr.read().decode()}")
+        try:
+            requests.get(f"http://127.0.0.1:{port}/stats", timeout=1)
+            return process
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    process.kill()
+    raise Exception(f"Erro ao subir {module}: sem resposta em 30s")
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Sem /proc (ex.: macOS): ru_maxrss é o pico do processo todo
+        factor = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * factor
+
+
+@contextmanager
+def rss_peak(result: dict, interval: float = 0.01):
+    """Amostra o RSS numa thread enquanto o bloco roda e grava início/pico em `result` (MB)."""
+    start = _rss_bytes()
+    peak = [start]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(interval):
+            peak[0] = max(peak[0], _rss_bytes())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        yield
+    finally:
+        done.set()
+        sampler.join()
+        peak[0] = max(peak[0], _rss_bytes())
+        result["rss_start_mb"] = round(start / 2**20, 1)
+        result["rss_peak_mb"] = round(peak[0] / 2**20, 1)
+
+
+class StageTimer:
+    """Acumula o tempo gasto em cada estágio do pipeline, trocando as funções por versões cronometradas."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals = {}
+
+    def reset(self):
+        with self._lock:
+            self.totals = {}
+
+    def _add(self, stage: str, elapsed: float):
+        with self._lock:
+            self.totals[stage] = self.totals.get(stage, 0.0) + elapsed
+
+    def wrap(self, owner, name: str, stage: str):
+        original = getattr(owner, name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self._add(stage, time.perf_counter() - start)
+
+        setattr(owner, name, timed)
+
+    def wrap_generator(self, owner, name: str, stage: str):
+        original = getattr(owner, name)
+
+        def timed(*args, **kwargs):
+            iterator = original(*args, **kwargs)
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    self._add(stage, time.perf_counter() - start)
+                    return
+                self._add(stage, time.perf_counter() - start)
+                yield item
+
+        setattr(owner, name, timed)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {stage: round(total, 3) for stage, total in sorted(self.totals.items())}
+
+
+def configure_environment(cache_dir: str, jira_url: str, llm_url: str, use_cache: bool):
+    """Aponta a aplicação para os servidores falsos; precisa rodar antes de importar `src`."""
+    os.environ.update({
+        "BASE_URL": jira_url,
+        "EMAIL": "bench@example.com",
+        "API_TOKEN_JIRA": "bench",
+        "DATABRICKS_ENDPOINT": f"{llm_url}/serving-endpoints/fake/invocations",
+        "DATABRICKS_TOKEN": "bench",
+        "JIRA_MODE": "live",
+        "JIRA_WEBHOOKS_ENABLED": "false",
+        "CACHE_DIR": cache_dir,
+        "CHANGELOG_CACHE_PATH": os.path.join(cache_dir, "changelogs.sqlite3") if use_cache else "",
+        "LLM_CACHE_PATH": os.path.join(cache_dir, "llm_cache.sqlite3") if use_cache else "",
+        "EVENT_STORE_PATH": os.path.join(cache_dir, "rework_events.sqlite3"),
+        # Cache de respostas e snapshots desligados: cada execução mede o pipeline, não uma consulta ao cache
+        "RESPONSE_CACHE_PATH": "",
+        "RESPONSE_CACHE_WARM_SECONDS": "0",
+        "SNAPSHOT_INTERVAL_SECONDS": "0",
+    })
+
+
+def instrument(timer: StageTimer):
+    import src.agents.rework_agent as rework_agent
+    import src.routes.jira_routes as jira_routes
+
+    timer.wrap(jira_routes.get_sprint_index(), "latest_sprints", "descoberta_sprints")
+    timer.wrap(jira_routes, "collect_rework_entries", "crawl_changelogs")
+    timer.wrap(rework_agent, "_prepare_rework_frames", "metricas")
+    timer.wrap(rework_agent, "_build_rework_task_text", "prompt")
+    timer.wrap(rework_agent, "generate_rework_narrative", "llm")
+    timer.wrap_generator(rework_agent, "stream_rework_narrative", "llm")
+
+
+def _stats(url: str) -> dict:
+    return requests.get(f"{url}/stats", timeout=10).json()
+
+
+def start_api(app, port: int):
+    """Sobe a API num servidor uvicorn em thread deste processo (RSS e estágios medidos aqui)."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise Exception("Erro ao subir a API para o benchmark")
+        time.sleep(0.05)
+    return server, thread
+
+
+def check_payload(payload, llm_route: bool, expect_llm_request: bool, llm_requests: int) -> list:
+    """
+    Motivos para descartar a execução: erro na resposta, análise do LLM sem
+    narrativa ou sem gráficos, ou nenhuma chamada ao LLM quando ela era
+    esperada (sem o cache de narrativas). Sem isso, o tempo do caminho de
+    falha entraria no relatório como se fosse o do LLM.
+    """
+    problems = []
+    if not isinstance(payload, dict):
+        return ["resposta vazia ou fora do formato JSON"]
+    if payload.get("error") or payload.get("type") == "error":
+        problems.append(f"erro na resposta: {payload.get('error') or payload.get('detail')}")
+    if llm_route:
+        analysis = payload.get("analysis") or {}
+        if analysis.get("llm_analysis", "Análise não disponível") == "Análise não disponível":
+            problems.append("análise do LLM não disponível")
+        metrics = (analysis.get("charts_data") or {}).get("metrics") or {}
+        if not metrics.get("total_concluidos") and not metrics.get("total_reprovados"):
+            problems.append("charts_data vazio")
+        if expect_llm_request and llm_requests == 0:
+            problems.append("nenhuma requisição ao LLM")
+    return problems
+
+
+def run_route(
+    client: requests.Session, timer: StageTimer, url: str, jira_url: str, llm_url: str,
+    stream: bool = False, llm_route: bool = False, expect_llm_request: bool = False
+) -> dict:
+    from src.routes.jira_routes import get_jira_client
+
+    jira_before = _stats(jira_url)
+    llm_before = _stats(llm_url)["requests"]
+    client_before = get_jira_client().get_http_stats()["requests"]
+    timer.reset()
+    result = {}
+    with rss_peak(result):
+        start = time.perf_counter()
+        payload = None
+        errors = []
+        if stream:
+            events = 0
+            first_event = None
+            with client.get(url, stream=True) as response:
+                for line in response.iter_lines():
+                    if line:
+                        events += 1
+                        if first_event is None:
+                            first_event = time.perf_counter() - start
+                        event = json.loads(line)
+                        if event.get("type") == "error":
+                            errors.append(event)
+                        elif event.get("type") == "final":
+                            payload = event
+            result["stream_events"] = events
+            result["first_event_s"] = round(first_event or 0, 3)
+        else:
+            response = client.get(url)
+            result["response_bytes"] = len(response.content)
+            if response.status_code == 200:
+                payload = response.json()
+        result["wall_s"] = round(time.perf_counter() - start, 3)
+    result["status_code"] = response.status_code
+    jira_after = _stats(jira_url)
+    result["jira_requests"] = jira_after["requests"] - jira_before["requests"]
+    result["jira_requests_by_endpoint"] = {
+        endpoint: count - jira_before["by_endpoint"].get(endpoint, 0)
+        for endpoint, count in jira_after["by_endpoint"].items()
+        if count - jira_before["by_endpoint"].get(endpoint, 0)
+    }
+    result["jira_client_requests"] = get_jira_client().get_http_stats()["requests"] - client_before
+    result["llm_requests"] = _stats(llm_url)["requests"] - llm_before
+    result["stages_s"] = timer.snapshot()
+    problems = [f"status {response.status_code}"] if response.status_code != 200 else []
+    problems += [f"erro na resposta: {event.get('detail')}" for event in errors]
+    if response.status_code == 200:
+        problems += check_payload(payload, llm_route, expect_llm_request, result["llm_requests"])
+    result["ok"] = not problems
+    if problems:
+        result["problems"] = problems
+    return result
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecida"
+
+
+def main(args) -> dict:
+    jira_port, llm_port = _free_port(), _free_port()
+    jira_url, llm_url = f"http://127.0.0.1:{jira_port}", f"http://127.0.0.1:{llm_port}"
+    servers = [
+        start_server("tools.fake_jira", jira_port, [
+            "--boards", str(args.boards), "--sprints", str(args.sprints), "--issues", str(args.issues),
+            "--histories", str(args.histories), "--items", str(args.items),
+            "--padding", str(args.padding), "--latency", str(args.jira_latency),
+        ]),
+        start_server("tools.fake_databricks", llm_port, [
+            "--latency", str(args.llm_latency), "--tokens", str(args.llm_tokens), "--token-delay", str(args.llm_token_delay),
+        ]),
+    ]
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            configure_environment(cache_dir, jira_url, llm_url, use_cache=not args.no_cache)
+            import_start = time.perf_counter()
+            from src.api.app import app
+            import_s = time.perf_counter() - import_start
+
+            timer = StageTimer()
+            instrument(timer)
+            api_url = f"http://127.0.0.1:{_free_port()}"
+            server, server_thread = start_api(app, int(api_url.rsplit(":", 1)[1]))
+            client = requests.Session()
+
+            # Board/sprint de exemplo para as rotas de um board só: a sprint mais nova do board 1
+            board_id = 1
+            sprint_id = max(range(board_id, args.sprints + 1, args.boards))
+            n = args.num_sprints
+            # (nome, caminho, streaming, rota com narrativa do LLM)
+            routes = [
+                ("boards", "/boards", False, False),
+                ("board_sprints", f"/boards/{board_id}/sprints", False, False),
+                ("all_analytics", f"/JIRA_all_analytics?num_sprints={n}", False, True),
+                ("all_analytics_stream", f"/JIRA_all_analytics/stream?num_sprints={n}", True, True),
+                ("daily_all_analytics", f"/JIRA_daily_all_analytics?num_sprints={n}", False, False),
+                ("board_changelogs", f"/JIRA_analitycs_with_changelogs?board_id={board_id}&sprint_id={sprint_id}", False, True),
+                ("board_daily", f"/JIRA_analitycs_daily?board_id={board_id}&sprint_id={sprint_id}", False, False),
+                ("rework_metrics", "/JIRA_rework_metrics?by_developer=true", False, False),
+            ]
+            if args.routes:
+                wanted = set(args.routes.split(","))
+                routes = [route for route in routes if route[0] in wanted]
+
+            results = {}
+            for name, path, stream, llm_route in routes:
+                runs = [
+                    # Com o cache de narrativas, a mesma análise já gerada (por outra rota ou execução) não chama o LLM
+                    run_route(client, timer, api_url + path, jira_url, llm_url, stream,
+                              llm_route=llm_route, expect_llm_request=args.no_cache)
+                    for _ in range(args.repeat)
+                ]
+                results[name] = {"path": path, "ok": all(run["ok"] for run in runs), "runs": runs}
+                print(f"{name}: " + ", ".join(f"{run['wall_s']}s" for run in runs), file=sys.stderr)
+                for run in runs:
+                    if not run["ok"]:
+                        print(f"  execução inválida de {name}: {'; '.join(run['problems'])}", file=sys.stderr)
+            server.should_exit = True
+            server_thread.join(timeout=10)
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait(timeout=10)
+
+    return {
+        "meta": {
+            "revision": _git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "app_import_s": round(import_s, 3),
+        },
+        "params": vars(args),
+        "ok": all(route["ok"] for route in results.values()),
+        "routes": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--boards", type=int, default=50)
+    parser.add_argument("--sprints", type=int, default=500)
+    parser.add_argument("--issues", type=int, default=20000)
+    parser.add_argument("--histories", type=int, default=8)
+    parser.add_argument("--items", type=int, default=2)
+    parser.add_argument("--padding", type=int, default=0, help="Bytes extras por issue nas páginas de board/sprint")
+    parser.add_argument("--num-sprints", type=int, default=500, help="num_sprints passado às rotas de todos os boards")
+    parser.add_argument("--jira-latency", type=float, default=0.0)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--llm-tokens", type=int, default=200)
+    parser.add_argument("--llm-token-delay", type=float, default=0.0)
+    parser.add_argument("--repeat", type=int, default=2, help="Execuções por rota (a primeira pega os caches frios)")
+    parser.add_argument("--no-cache", action="store_true", help="Desliga os caches de changelog e do LLM")
+    parser.add_argument("--routes", default="", help="Subconjunto de rotas, separadas por vírgula")
+    parser.add_argument("--output", default="", help="Arquivo JSON de saída (padrão: só imprime)")
+    args = parser.parse_args()
+
+    report = main(args)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"Resultado gravado em {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    if not report["ok"]:
+        sys.exit("Benchmark inválido: alguma rota respondeu pelo caminho de erro (veja `problems`)")
@@ -0,0 +1,132 @@
+"""
+Benchmark da extração de eventos de retrabalho: `filter_reprovado_entries` +
+DataFrame + `pd.to_datetime` (caminho antigo do agente) contra o caminho
+colunar `extract_rework_frame`, sobre changelogs sintéticos. Também compara a
+memória para manter os eventos como lista de dicts ou `ReworkEventTable`.
+
+Uso:
+    python -m benchmarks.bench_rework_extraction --issues 20000 --histories 30 --items 3
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+import pandas as pd
+
+from src.utils.rework_search import ReworkEventTable, extract_rework_frame, filter_reprovado_entries
+
+STATUSES = ['Reprovado', 'Em produção', 'Em release', 'Em Homologação', 'Em andamento', 'Code review', 'To Do']
+FIELDS = ['status', 'assignee', 'Sprint', 'Story Points', 'description']
+DEVS = [f"Dev {i}" for i in range(60)]
+
+
+def synthetic_issues(num_issues: int, histories: int, items: int, seed: int = 42):
+    rng = random.Random(seed)
+    issues = []
+    for n in range(num_issues):
+        changelog = []
+        for h in range(histories):
+            created = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00.000-0300"
+            changelog.append({
+                "created": created,
+                "items": [
+                    {"field": rng.choice(FIELDS), "toString": rng.choice(STATUSES)}
+                    for _ in range(items)
+                ],
+            })
+        dev = {"value": rng.choice(DEVS)}
+        assignee = {"displayName": rng.choice(DEVS)}
+        issues.append((f"PRJ-{n}", dev, float(rng.choice([1, 2, 3, 5, 8])), {"changelog": {"histories": changelog}}, assignee))
+    return issues
+
+
+def legacy_path(issues) -> pd.DataFrame:
+    entries = []
+    for issue_key, dev, sp, changelog_data, assignee in issues:
+        entries.extend(filter_reprovado_entries(issue_key, dev, sp, changelog_data, assignee))
+    df = pd.DataFrame(entries)
+    df['data_mudanca'] = pd.to_datetime(df['data_mudanca']).dt.tz_localize(None)
+    df['desenvolvedor'] = df['desenvolvedor'].apply(lambda x: x['value'] if isinstance(x, dict) and 'value' in x else x)
+    return df
+
+
+def columnar_path(issues) -> pd.DataFrame:
+    return extract_rework_frame(issues)
+
+
+def storage_footprint(issues) -> dict:
+    """Memória para manter os eventos entre o fetch e o agente: lista de dicts x `ReworkEventTable`."""
+    result = {}
+    for name, build in (
+        ("dict_list_mb", lambda: [e for i in issues for e in filter_reprovado_entries(*i)]),
+        ("event_table_mb", lambda: _fill_table(issues)),
+    ):
+        gc.collect()
+        tracemalloc.start()
+        kept = build()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result[name] = round(current / 2**20, 1)
+        del kept
+    return result
+
+
+def _fill_table(issues) -> ReworkEventTable:
+    table = ReworkEventTable()
+    for issue in issues:
+        table.add_issue(*issue)
+    return table
+
+
+def measure(fn, issues, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn(issues)
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    df = fn(issues)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "best_s": round(min(times), 4),
+        "mean_s": round(sum(times) / len(times), 4),
+        "peak_alloc_mb": round(peak / 2**20, 1),
+        "frame_mb": round(df.memory_usage(deep=True).sum() / 2**20, 1),
+        "rows": len(df),
+    }, df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", type=int, default=5000)
+    parser.add_argument("--histories", type=int, default=30)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    issues = synthetic_issues(args.issues, args.histories, args.items)
+    legacy, legacy_df = measure(legacy_path, issues, args.repeat)
+    columnar, columnar_df = measure(columnar_path, issues, args.repeat)
+
+    # Os dois caminhos precisam produzir exatamente os mesmos eventos
+    columns = ['card_key', 'responsavel', 'desenvolvedor', 'status_novo', 'data_mudanca', 'sp']
+    pd.testing.assert_frame_equal(
+        legacy_df[columns].astype(str).reset_index(drop=True),
+        columnar_df[columns].astype(str).reset_index(drop=True),
+    )
+
+    print(json.dumps({
+        "issues": args.issues,
+        "histories_per_issue": args.histories,
+        "items_per_history": args.items,
+        "legacy": legacy,
+        "columnar": columnar,
+        "speedup": round(legacy["best_s"] / columnar["best_s"], 2) if columnar["best_s"] else None,
+        "event_storage": storage_footprint(issues),
+    }, indent=2))
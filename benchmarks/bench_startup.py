@@ -0,0 +1,179 @@
+"""
+Benchmark de inicialização: tempo de importação a frio dos módulos da API
+(num interpretador novo a cada execução, com os módulos mais caros segundo
+`-X importtime`), tempo até o servidor uvicorn responder e latência da
+primeira requisição de analytics contra o Jira e o Databricks falsos, com e
+sem o aquecimento do startup (STARTUP_WARMUP). O resultado sai em JSON.
+
+Uso:
+    python -m benchmarks.bench_startup --repeat 5 --output benchmarks/results/startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import requests
+
+from benchmarks.bench_e2e import ROOT, _free_port, _git_revision, configure_environment, start_server
+
+HEAVY_MODULES = ("pandas", "numpy", "crewai", "langchain_core", "litellm", "matplotlib")
+
+_IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"s": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, repeat: int) -> dict:
+    """Importa `module` em `repeat` interpretadores novos; devolve mediana, mínimo e dependências pesadas carregadas."""
+    runs = []
+    loaded = []
+    for _ in range(repeat):
+        output = subprocess.check_output(
+            [sys.executable, "-c", _IMPORT_SNIPPET.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=ROOT, stderr=subprocess.DEVNULL, text=True
+        )
+        result = json.loads(output.strip().splitlines()[-1])
+        runs.append(result["s"])
+        loaded = result["loaded"]
+    return {
+        "median_s": round(statistics.median(runs), 3),
+        "min_s": round(min(runs), 3),
+        "heavy_modules_loaded": loaded,
+    }
+
+
+def import_profile(module: str, top: int) -> list:
+    """Pacotes (e módulos de `src`) mais caros, em tempo acumulado, segundo `python -X importtime`."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        name = name.strip()
+        # Pacotes de topo e módulos da aplicação; submódulos já entram no acumulado do pacote
+        if name == module or ("." in name and not name.startswith("src.")):
+            continue
+        entries.append({"module": name, "cumulative_s": round(int(cumulative) / 1e6, 3)})
+    return sorted(entries, key=lambda entry: entry["cumulative_s"], reverse=True)[:top]
+
+
+def measure_server(route: str, warmup: bool, settle: float) -> dict:
+    """
+    Sobe a API num subprocesso uvicorn e mede: tempo até o primeiro `/metrics`
+    responder (partida a frio) e a duração da primeira e da segunda chamada à
+    rota. Com aquecimento, espera `settle` segundos antes da primeira chamada,
+    como o intervalo entre o deploy e o tráfego real.
+    """
+    port = _free_port()
+    env = dict(os.environ, STARTUP_WARMUP="true" if warmup else "false")
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    result = {"warmup": warmup}
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise Exception("Erro ao subir a API para o benchmark")
+            try:
+                requests.get(f"{url}/metrics", timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.02)
+        result["cold_start_s"] = round(time.perf_counter() - start, 3)
+        if warmup and settle:
+            time.sleep(settle)
+        for label in ("first_request", "second_request"):
+            request_start = time.perf_counter()
+            response = requests.get(url + route, timeout=600)
+            result[f"{label}_s"] = round(time.perf_counter() - request_start, 3)
+            result[f"{label}_status"] = response.status_code
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return result
+
+
+def main(args) -> dict:
+    modules = [m.strip() for m in args.modules.split(",") if m.strip()]
+    imports = {module: measure_import(module, args.repeat) for module in modules}
+    for module, result in imports.items():
+        print(f"import {module}: {result['median_s']}s", file=sys.stderr)
+    profile = import_profile(modules[0], args.top)
+
+    jira_port, llm_port = _free_port(), _free_port()
+    jira_url, llm_url = f"http://127.0.0.1:{jira_port}", f"http://127.0.0.1:{llm_port}"
+    servers = [
+        start_server("tools.fake_jira", jira_port, ["--boards", "2", "--sprints", "4", "--issues", "200"]),
+        start_server("tools.fake_databricks", llm_port, ["--latency", str(args.llm_latency)]),
+    ]
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            configure_environment(cache_dir, jira_url, llm_url, use_cache=False)
+            scenarios = {}
+            for name, warmup in (("sem_aquecimento", False), ("com_aquecimento", True)):
+                scenarios[name] = measure_server(args.route, warmup, args.settle)
+                print(f"{name}: {scenarios[name]}", file=sys.stderr)
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait(timeout=10)
+
+    return {
+        "meta": {
+            "revision": _git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "params": vars(args),
+        "imports": imports,
+        "import_profile": profile,
+        "server": scenarios,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", default="src.api.app,src.routes.jira_routes,src.agents.rework_agent",
+                        help="Módulos medidos, separados por vírgula (o primeiro também vai para o perfil -X importtime)")
+    parser.add_argument("--repeat", type=int, default=5, help="Interpretadores novos por módulo")
+    parser.add_argument("--top", type=int, default=15, help="Quantos módulos de topo listar no perfil")
+    parser.add_argument("--route", default="/JIRA_analitycs_with_changelogs?board_id=1&sprint_id=3",
+                        help="Rota usada para a primeira requisição")
+    parser.add_argument("--settle", type=float, default=8.0, help="Espera (s) antes da primeira requisição com aquecimento")
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--output", default="", help="Arquivo JSON de saída (padrão: só imprime)")
+    args = parser.parse_args()
+
+    report = main(args)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"Resultado gravado em {args.output}", file=sys.stderr)
+    else:
+        print(output)
@@ -1,130 +1,274 @@
-from crewai import Agent, Task, Crew
-from typing import Dict, Any, List
+from typing import TYPE_CHECKING, Dict, Any, Iterator, List, Union
 from datetime import datetime, timedelta
 import pandas as pd
 
 # --- MUDANÇA 1: Importações ---
-# Importamos nosso cliente customizado e o arquivo de configuração
-from src.utils.custom_llm import ChatDatabricks
+# Importamos o arquivo de configuração; LangChain e o cliente customizado
+# (ChatDatabricks) só são importados quando uma narrativa é de fato gerada
+from src.agents.rework_prompt import build_rework_prompt_data
+from src.utils.llm_cache import LLMCache, content_hash
+from src.utils.rework_search import ReworkEventTable, frame_to_records
+from src.utils.metrics import stage
 import src.config.config as config
 
+if TYPE_CHECKING:
+    from src.utils.custom_llm import ChatDatabricks
 
-def create_rework_agent(reprovados_data: List[Dict[str, Any]], start_date: datetime = None, end_date: datetime = None) -> Dict[str, Any]:
-    try:
-        # ... (Toda a sua lógica com o DataFrame pandas permanece exatamente igual) ...
-        df = pd.DataFrame(reprovados_data)
-        df['data_mudanca'] = pd.to_datetime(df['data_mudanca']).dt.tz_localize(None)
-        if 'desenvolvedor' in df.columns:
-            df['desenvolvedor'] = df['desenvolvedor'].apply(
-                lambda x: x['value'] if isinstance(x, dict) and 'value' in x else x
-            )
-        if start_date is None:
-            start_date_dt = datetime.now() - timedelta(days=15)
-        else:
-            start_date_dt = start_date
-        if end_date is None:
-            end_date_dt = datetime.now()
-        else:
-            end_date_dt = end_date
-
-        start_date_str = start_date_dt.strftime("%d-%m-%Y")
-        end_date_str = end_date_dt.strftime("%d-%m-%Y")
-
-        df_filtrado = df[(df['data_mudanca'] >= start_date_dt) & (df['data_mudanca'] <= end_date_dt)]
-
-        conclusoes = df_filtrado[df_filtrado['status_novo'].isin(['Em produção', 'Em release', 'Em Homologação'])]
-        conclusoes = conclusoes.drop_duplicates(subset=['card_key'], keep='first')
-        reprovacoes = df_filtrado[df_filtrado['status_novo'] == 'Reprovado']
-        reprovacoes = reprovacoes.drop_duplicates(
-            subset=['card_key', 'status_novo', 'responsavel', 'data_mudanca', 'sp'],
-            keep='first'
-        )
+# Eventos de retrabalho: tabela colunar, DataFrame já tipado ou lista de dicts (formato antigo)
+ReworkData = Union[ReworkEventTable, pd.DataFrame, List[Dict[str, Any]]]
 
-        # --- MUDANÇA 2: Definição do LLM ---
-        # Removemos a antiga definição do LLM e instanciamos nosso cliente customizado,
-        # passando as credenciais carregadas do arquivo de configuração.
-        llm = ChatDatabricks(
-            endpoint_url=config.DATABRICKS_ENDPOINT,
-            token=config.DATABRICKS_TOKEN,
-            temperature=0.7,
-        )
+# Incrementar sempre que o prompt mudar, para não reaproveitar análises antigas
+PROMPT_VERSION = "3"
 
-        # --- NENHUMA MUDANÇA DAQUI EM DIANTE ---
-        # O CrewAI funciona perfeitamente com nosso objeto `llm` customizado.
-        rework_agent = Agent(
-            role="Analista de Métricas Ágeis",
-            goal="Analisar os dados dos cards para extrair insights analíticos relevantes, identificando padrões, tendências e oportunidades de melhoria no processo de desenvolvimento.",
-            backstory="Você é um especialista em métricas ágeis, com vasta experiência em transformar dados em insights estratégicos. Seu foco é analisar os registros dos cards para identificar oportunidades de melhoria e gargalos no desempenho dos desenvolvedores, apresentando apenas os insights analíticos que realmente importam, sem expor os cálculos brutos.",
-            llm=llm,
-            verbose=True
-        )
+llm_cache = LLMCache(
+    config.LLM_CACHE_PATH,
+    max_entries=config.LLM_CACHE_MAX_ENTRIES,
+    max_age=config.LLM_CACHE_MAX_AGE
+) if config.LLM_CACHE_PATH else None
 
-        rework_task = Task(
-            description=f"""
-            ## Insights Analíticos Relevantes - Período: {start_date_str} a {end_date_str}
-            
-            **Objetivo:**
-            - Extrair insights analíticos relevantes a partir da análise dos dados dos cards, evidenciando padrões e oportunidades de melhoria no desempenho dos desenvolvedores, sem apresentar os números brutos.
-            
-            **Processamento:**
-            1. Filtrar os registros dos cards para o período entre {start_date_str} e {end_date_str}.
-            2. Analisar os registros para identificar padrões de reprovações e a acumulação de Story Points nos cards concluídos.
-            3. Agregar as informações por desenvolvedor e identificar tendências que possam indicar gargalos ou oportunidades de otimização.
-            4. Gerar insights analíticos que orientem melhorias no processo de desenvolvimento, apresentando somente as conclusões estratégicas.
-            
-            **ATENÇÃO:**
-            Utilize os dados a seguir para derivar insights analíticos, sem expor os valores brutos:
-            ---------------------
-            {df_filtrado.to_dict(orient='records')}
-            ---------------------
-            - Considere as reprovações conforme a variável {reprovacoes.to_dict(orient='records')}.
-            - Considere as conclusões e a soma dos Story Points conforme a variável {conclusoes.to_dict(orient='records')}, contabilizando apenas os cards indicados.
-            - O total de reprovações deve corresponder à variável {len(reprovacoes)}.
-            
-            **Dados de Entrada:**
-            - Lista de registros contendo:
-            - 'card_key': Identificador do card.
-            - 'responsavel': Nome do desenvolvedor.
-            - 'status_novo': Novo status do card.
-            - 'sp': Story Points do card.
-            - 'data_mudanca': Data da mudança de status.
-            
-            **Saída Esperada:**
-            - Relatório final contendo apenas os insights analíticos relevantes, destacando:
-            - Padrões e tendências de desempenho entre os desenvolvedores.
-            - Recomendações e oportunidades de melhoria para otimização do processo de desenvolvimento.
-            - O resultado final deve ser uma análise visualmente limpa, sem a utilização de asteriscos e hashtags, tente montar uma estrutura clara, objetiva e organizada.
-            """,
-            expected_output=f"""
-            Relatório Consolidado - Período: {start_date_str} a {end_date_str}
-            
-            Insights Analíticos Relevantes
-            - [Insight 1]: ...
-            - [Insight 2]: ...
-            """,
-            agent=rework_agent,
-        )
+
+def _empty_charts_data() -> Dict[str, Any]:
+    return {
+        "conclusoes": [],
+        "reprovacoes": [],
+        "metrics": {
+            "total_concluidos": 0,
+            "total_reprovados": 0,
+            "total_reprovas": 0
+        }
+    }
 
 
-        crew = Crew(
-            agents=[rework_agent],
-            tasks=[rework_task],
-            verbose=True
+def _to_event_frame(reprovados_data: ReworkData) -> pd.DataFrame:
+    # Tabela colunar (caminho normal das rotas) já vem tipada; listas de dicts são convertidas como antes
+    if isinstance(reprovados_data, ReworkEventTable):
+        return reprovados_data.to_frame()
+    if isinstance(reprovados_data, pd.DataFrame):
+        return reprovados_data
+    df = pd.DataFrame(reprovados_data)
+    df['data_mudanca'] = pd.to_datetime(df['data_mudanca']).dt.tz_localize(None)
+    if 'desenvolvedor' in df.columns:
+        df['desenvolvedor'] = df['desenvolvedor'].apply(
+            lambda x: x['value'] if isinstance(x, dict) and 'value' in x else x
         )
-        llm_result = crew.kickoff()
+    return df
+
+
+def _prepare_rework_frames(reprovados_data: ReworkData, start_date: datetime = None, end_date: datetime = None) -> Dict[str, Any]:
+    """Filtra o período e separa conclusões e reprovações (sem nenhuma chamada ao LLM)."""
+    with stage("processamento"):
+        return _filter_rework_frames(reprovados_data, start_date, end_date)
+
+
+def _filter_rework_frames(reprovados_data: ReworkData, start_date: datetime = None, end_date: datetime = None) -> Dict[str, Any]:
+    df = _to_event_frame(reprovados_data)
+    if start_date is None:
+        start_date_dt = datetime.now() - timedelta(days=15)
+    else:
+        start_date_dt = start_date
+    if end_date is None:
+        end_date_dt = datetime.now()
+    else:
+        end_date_dt = end_date
+
+    df_filtrado = df[(df['data_mudanca'] >= start_date_dt) & (df['data_mudanca'] <= end_date_dt)]
+
+    conclusoes = df_filtrado[df_filtrado['status_novo'].isin(['Em produção', 'Em release', 'Em Homologação'])]
+    conclusoes = conclusoes.drop_duplicates(subset=['card_key'], keep='first')
+    reprovacoes = df_filtrado[df_filtrado['status_novo'] == 'Reprovado']
+    reprovacoes = reprovacoes.drop_duplicates(
+        subset=['card_key', 'status_novo', 'responsavel', 'data_mudanca', 'sp'],
+        keep='first'
+    )
+    return {
+        "start_date_str": start_date_dt.strftime("%d-%m-%Y"),
+        "end_date_str": end_date_dt.strftime("%d-%m-%Y"),
+        "df_filtrado": df_filtrado,
+        "conclusoes": conclusoes,
+        "reprovacoes": reprovacoes,
+    }
+
 
+def _charts_data(frames: Dict[str, Any]) -> Dict[str, Any]:
+    conclusoes = frames["conclusoes"]
+    reprovacoes = frames["reprovacoes"]
+    with stage("serializacao"):
         return {
-            "llm_analysis": llm_result, 
-            "charts_data": {
-                "conclusoes": conclusoes.to_dict(orient='records'),
-                "reprovacoes": reprovacoes.to_dict(orient='records'),
-                "metrics": {
-                    "total_concluidos": conclusoes['card_key'].nunique(),
-                    "total_reprovados": reprovacoes['card_key'].nunique(),
-                    "total_reprovas": len(reprovacoes)
-                }
+            "conclusoes": frame_to_records(conclusoes),
+            "reprovacoes": frame_to_records(reprovacoes),
+            "metrics": {
+                "total_concluidos": int(conclusoes['card_key'].nunique()),
+                "total_reprovados": int(reprovacoes['card_key'].nunique()),
+                "total_reprovas": len(reprovacoes)
             }
         }
+
+
+def compute_rework_metrics(reprovados_data: ReworkData, start_date: datetime = None, end_date: datetime = None) -> Dict[str, Any]:
+    """
+    Caminho rápido e determinístico: filtragem, deduplicação, conclusões e
+    contagem de retrabalho, sem chamar o modelo.
+    """
+    try:
+        frames = _prepare_rework_frames(reprovados_data, start_date, end_date)
+        return {"charts_data": _charts_data(frames)}
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f"Erro ao calcular as métricas de retrabalho: {e}", exc_info=True)
+        return {"error": str(e), "charts_data": _empty_charts_data()}
+
+
+REWORK_AGENT_PROFILE = {
+    "role": "Analista de Métricas Ágeis",
+    "goal": "Analisar os dados dos cards para extrair insights analíticos relevantes, identificando padrões, tendências e oportunidades de melhoria no processo de desenvolvimento.",
+    "backstory": "Você é um especialista em métricas ágeis, com vasta experiência em transformar dados em insights estratégicos. Seu foco é analisar os registros dos cards para identificar oportunidades de melhoria e gargalos no desempenho dos desenvolvedores, apresentando apenas os insights analíticos que realmente importam, sem expor os cálculos brutos.",
+}
+
+
+def _build_rework_llm() -> "ChatDatabricks":
+    # --- MUDANÇA 2: Definição do LLM ---
+    # Removemos a antiga definição do LLM e instanciamos nosso cliente customizado,
+    # passando as credenciais carregadas do arquivo de configuração.
+    from src.utils.custom_llm import ChatDatabricks
+
+    return ChatDatabricks(
+        endpoint_url=config.DATABRICKS_ENDPOINT,
+        token=config.DATABRICKS_TOKEN,
+        temperature=0.7,
+        connect_timeout=config.DATABRICKS_CONNECT_TIMEOUT,
+        read_timeout=config.DATABRICKS_READ_TIMEOUT,
+        max_concurrency=config.DATABRICKS_MAX_CONCURRENCY,
+        max_retries=config.DATABRICKS_MAX_RETRIES,
+    )
+
+
+def _build_rework_task_text(frames: Dict[str, Any]) -> Dict[str, str]:
+    """Descrição e saída esperada da tarefa, compartilhadas pela geração síncrona e pelo streaming."""
+    start_date_str = frames["start_date_str"]
+    end_date_str = frames["end_date_str"]
+    # Apenas agregados compactos vão para o modelo, nunca os registros brutos
+    with stage("prompt"):
+        prompt_data = build_rework_prompt_data(frames, config.LLM_PROMPT_TOKEN_BUDGET)
+
+    description = f"""
+    ## Insights Analíticos Relevantes - Período: {start_date_str} a {end_date_str}
+    
+    **Objetivo:**
+    - Extrair insights analíticos relevantes a partir da análise dos dados dos cards, evidenciando padrões e oportunidades de melhoria no desempenho dos desenvolvedores, sem apresentar os números brutos.
+    
+    **Processamento:**
+    Os dados abaixo já estão filtrados para o período entre {start_date_str} e {end_date_str}, deduplicados e agregados por desenvolvedor; não refaça filtros, contagens ou somas.
+    1. Comparar os desenvolvedores pela taxa de retrabalho, pelas reprovações e pelos Story Points entregues, considerando o volume de cada um.
+    2. Relacionar o ciclo médio de reaprovação com as reprovações para identificar gargalos no fluxo de correção.
+    3. Interpretar os totais e os maiores ofensores como contexto do time no período.
+    4. Gerar insights analíticos que orientem melhorias no processo de desenvolvimento, apresentando somente as conclusões estratégicas.
+    
+    **ATENÇÃO:**
+    Interprete os dados agregados a seguir para derivar insights analíticos, sem expor os valores brutos:
+    ---------------------
+    {prompt_data['tabela']}
+    ---------------------
+    - Total de cards concluídos: {prompt_data['total_concluidos']}, somando {prompt_data['sp_total']:.1f} Story Points.
+    - Total de cards reprovados: {prompt_data['total_reprovados']}.
+    - Total de reprovações: {prompt_data['total_reprovas']}.
+    - Maiores ofensores em reprovações: {prompt_data['destaques']}.
+    
+    **Dados de Entrada:**
+    - Tabela (separada por '|') com uma linha por desenvolvedor:
+    - 'desenvolvedor': Nome do desenvolvedor.
+    - 'aprovacoes': Cards concluídos no período.
+    - 'reprovacoes': Reprovações no período.
+    - 'taxa_retrabalho': Reprovações / (aprovações + reprovações).
+    - 'sp_entregues': Soma dos Story Points dos cards concluídos.
+    - 'ciclo_medio_h': Tempo médio, em horas, entre uma reprovação e a reaprovação do card.
+    
+    **Saída Esperada:**
+    - Relatório final contendo apenas os insights analíticos relevantes, destacando:
+    - Padrões e tendências de desempenho entre os desenvolvedores.
+    - Recomendações e oportunidades de melhoria para otimização do processo de desenvolvimento.
+    - O resultado final deve ser uma análise visualmente limpa, sem a utilização de asteriscos e hashtags, tente montar uma estrutura clara, objetiva e organizada.
+    """
+    expected_output = f"""
+    Relatório Consolidado - Período: {start_date_str} a {end_date_str}
+    
+    Insights Analíticos Relevantes
+    - [Insight 1]: ...
+    - [Insight 2]: ...
+    """
+    return {"description": description, "expected_output": expected_output}
+
+
+def _narrative_cache_key(task_text: Dict[str, str]) -> str:
+    # O texto da tarefa já contém o período e os agregados dos dados filtrados
+    return content_hash(PROMPT_VERSION, config.DATABRICKS_ENDPOINT, task_text)
+
+
+def _rework_messages(task_text: Dict[str, str]) -> list:
+    """Perfil do analista como mensagem de sistema e a tarefa como mensagem do usuário."""
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    return [
+        SystemMessage(content=(
+            f"Você é um {REWORK_AGENT_PROFILE['role']}. {REWORK_AGENT_PROFILE['backstory']}\n"
+            f"Seu objetivo: {REWORK_AGENT_PROFILE['goal']}"
+        )),
+        HumanMessage(content=f"{task_text['description']}\n\nFormato esperado da resposta:\n{task_text['expected_output']}"),
+    ]
+
+
+def generate_rework_narrative(frames: Dict[str, Any]) -> str:
+    """
+    Etapa opcional: gera a análise narrativa via LLM (ou a reaproveita do cache).
+    Chama o ChatDatabricks diretamente, como o streaming: o CrewAI convertia o
+    cliente num LLM do LiteLLM e ignorava sessão, timeouts, semáforo e retries.
+    """
+    task_text = _build_rework_task_text(frames)
+    cache_key = _narrative_cache_key(task_text)
+    if llm_cache is not None:
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    with stage("llm"):
+        narrative = str(_build_rework_llm().invoke(_rework_messages(task_text)).content)
+    if llm_cache is not None:
+        llm_cache.put(cache_key, narrative)
+    return narrative
+
+
+def stream_rework_narrative(frames: Dict[str, Any]) -> Iterator[str]:
+    """
+    Gera a mesma análise narrativa, mas chamando o modelo diretamente em modo
+    streaming e devolvendo o texto aos pedaços, conforme os tokens chegam.
+    Fechar o gerador interrompe a geração no endpoint.
+    """
+    task_text = _build_rework_task_text(frames)
+    cache_key = _narrative_cache_key(task_text)
+    if llm_cache is not None:
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+    pieces = []
+    with stage("llm"):
+        for chunk in _build_rework_llm().stream(_rework_messages(task_text)):
+            if chunk.content:
+                pieces.append(chunk.content)
+                yield chunk.content
+    # Só chega aqui se a geração terminou (sem cancelamento), então a narrativa está completa
+    if llm_cache is not None:
+        llm_cache.put(cache_key, "".join(pieces))
+
+
+def create_rework_agent(reprovados_data: ReworkData, start_date: datetime = None, end_date: datetime = None) -> Dict[str, Any]:
+    try:
+        frames = _prepare_rework_frames(reprovados_data, start_date, end_date)
+        llm_result = generate_rework_narrative(frames)
+
+        return {
+            "llm_analysis": llm_result, 
+            "charts_data": _charts_data(frames)
+        }
     except Exception as e:
         # Adiciona um log mais detalhado do erro
         import logging
@@ -132,13 +276,25 @@ def create_rework_agent(reprovados_data: List[Dict[str, Any]], start_date: datet
         logger.error(f"Erro ao executar o agente de retrabalho: {e}", exc_info=True)
         return {
             "error": str(e),
-            "charts_data": {
-                "conclusoes": [],
-                "reprovacoes": [],
-                "metrics": {
-                    "total_concluidos": 0,
-                    "total_reprovados": 0,
-                    "total_reprovas": 0
-                }
-            }
-        }
\ No newline at end of file
+            "charts_data": _empty_charts_data()
+        }
+
+
+def stream_rework_agent(reprovados_data: ReworkData, start_date: datetime = None, end_date: datetime = None) -> Iterator[Dict[str, Any]]:
+    """
+    Equivalente a `create_rework_agent` em streaming: gera {"delta": texto} a
+    cada trecho da narrativa e, por último, o mesmo dicionário de resultado
+    (`llm_analysis` completo + `charts_data`).
+    """
+    try:
+        frames = _prepare_rework_frames(reprovados_data, start_date, end_date)
+        pieces = []
+        for delta in stream_rework_narrative(frames):
+            pieces.append(delta)
+            yield {"delta": delta}
+        yield {"llm_analysis": "".join(pieces), "charts_data": _charts_data(frames)}
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f"Erro ao executar o agente de retrabalho em streaming: {e}", exc_info=True)
+        yield {"error": str(e), "charts_data": _empty_charts_data()}
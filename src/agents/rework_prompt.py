@@ -0,0 +1,96 @@
+from typing import Any, Dict
+import pandas as pd
+
+STATUS_CONCLUSAO = ['Em produção', 'Em release', 'Em Homologação']
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa grosseira (~4 caracteres por token), suficiente para o controle de orçamento."""
+    return len(text) // 4
+
+
+def build_developer_summary(frames: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Agrega por desenvolvedor (responsável): aprovações, reprovações, taxa de
+    retrabalho, Story Points entregues e o tempo médio (em horas) entre uma
+    reprovação e a reaprovação seguinte do mesmo card.
+    """
+    df_filtrado = frames["df_filtrado"]
+    # `responsavel` categórico gera índices com códigos int8/int16 conforme o grupo (vazio x 127+ nomes),
+    # que o concat abaixo não consegue alinhar; agrupa pelos nomes como texto
+    conclusoes = frames["conclusoes"].astype({'responsavel': object})
+    reprovacoes = frames["reprovacoes"].astype({'responsavel': object})
+
+    aprovacoes = conclusoes.groupby('responsavel', observed=True).size().rename('aprovacoes')
+    sp_entregues = (
+        conclusoes.assign(sp=pd.to_numeric(conclusoes['sp'], errors='coerce').fillna(0))
+        .groupby('responsavel', observed=True)['sp'].sum().rename('sp_entregues')
+    )
+    total_reprovacoes = reprovacoes.groupby('responsavel', observed=True).size().rename('reprovacoes')
+
+    # Para cada reprovação, a próxima conclusão do mesmo card
+    eventos_conclusao = df_filtrado[df_filtrado['status_novo'].isin(STATUS_CONCLUSAO)][['card_key', 'data_mudanca']]
+    eventos_conclusao = eventos_conclusao.assign(data_reaprovacao=eventos_conclusao['data_mudanca']).sort_values('data_mudanca')
+    ciclos = pd.merge_asof(
+        reprovacoes[['card_key', 'responsavel', 'data_mudanca']].sort_values('data_mudanca'),
+        eventos_conclusao,
+        on='data_mudanca',
+        by='card_key',
+        direction='forward',
+        allow_exact_matches=False
+    )
+    ciclos['ciclo_h'] = (ciclos['data_reaprovacao'] - ciclos['data_mudanca']).dt.total_seconds() / 3600
+    ciclo_medio = ciclos.groupby('responsavel', observed=True)['ciclo_h'].mean().rename('ciclo_medio_h')
+
+    summary = pd.concat([aprovacoes, total_reprovacoes, sp_entregues, ciclo_medio], axis=1)
+    summary[['aprovacoes', 'reprovacoes', 'sp_entregues']] = summary[['aprovacoes', 'reprovacoes', 'sp_entregues']].fillna(0)
+    summary[['aprovacoes', 'reprovacoes']] = summary[['aprovacoes', 'reprovacoes']].astype(int)
+    eventos = summary['aprovacoes'] + summary['reprovacoes']
+    summary['taxa_retrabalho'] = (summary['reprovacoes'] / eventos.where(eventos > 0)).fillna(0)
+    summary = summary.reset_index().rename(columns={'index': 'desenvolvedor', 'responsavel': 'desenvolvedor'})
+    summary = summary[['desenvolvedor', 'aprovacoes', 'reprovacoes', 'taxa_retrabalho', 'sp_entregues', 'ciclo_medio_h']]
+    return summary.sort_values(['reprovacoes', 'sp_entregues'], ascending=False, ignore_index=True)
+
+
+def _render_table(summary: pd.DataFrame) -> str:
+    return summary.to_csv(index=False, sep='|', float_format='%.2f')
+
+
+def build_rework_prompt_data(frames: Dict[str, Any], token_budget: int, top_n: int = 5) -> Dict[str, Any]:
+    """
+    Monta o conteúdo compacto enviado ao LLM: a tabela agregada por
+    desenvolvedor, os maiores ofensores e os totais. Se a tabela ultrapassar
+    `token_budget`, mantém apenas as linhas mais relevantes (já ordenadas por
+    reprovações e SP) e informa quantas foram omitidas.
+    """
+    summary = build_developer_summary(frames)
+    conclusoes = frames["conclusoes"]
+    reprovacoes = frames["reprovacoes"]
+
+    ofensores = summary[summary['reprovacoes'] > 0].head(top_n)
+    destaques = ", ".join(
+        f"{row.desenvolvedor} ({row.reprovacoes} reprovações)" for row in ofensores.itertuples()
+    ) or "nenhum"
+
+    tabela = _render_table(summary)
+    linhas = len(summary)
+    if estimate_tokens(tabela) > token_budget and linhas > 1:
+        # Busca binária pelo maior prefixo da tabela que cabe no orçamento
+        low, high = 1, linhas
+        while low < high:
+            mid = (low + high + 1) // 2
+            if estimate_tokens(_render_table(summary.head(mid))) <= token_budget:
+                low = mid
+            else:
+                high = mid - 1
+        tabela = _render_table(summary.head(low))
+        tabela += f"... {linhas - low} desenvolvedores omitidos por limite de tamanho\n"
+
+    return {
+        "tabela": tabela,
+        "destaques": destaques,
+        "total_concluidos": conclusoes['card_key'].nunique(),
+        "total_reprovados": reprovacoes['card_key'].nunique(),
+        "total_reprovas": len(reprovacoes),
+        "sp_total": float(pd.to_numeric(conclusoes['sp'], errors='coerce').fillna(0).sum()),
+    }
@@ -1,5 +1,10 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import logging
+import threading
 
 # configura log antes de tudo
 logging.basicConfig(
@@ -7,10 +12,71 @@ logging.basicConfig(
     format="%(asctime)s %(levelname)s %(name)s %(message)s"
 )
 
-from src.routes.jira_routes import router
+from src.routes.jira_routes import refresh_snapshots, router, warm_response_cache, warm_up
+from src.routes.job_routes import router as job_router
+from src.routes.webhook_routes import router as webhook_router
+import src.config.config as config
+from src.utils.metrics import ServerTimingMiddleware
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+
+def _warm_up():
+    try:
+        warm_up()
+        logger.info("Aquecimento concluído: agregados hidratados e dependências do agente carregadas.")
+    except Exception as e:
+        logger.error(f"Erro no aquecimento do startup: {e}", exc_info=True)
+
+
+async def _run_periodically(task, interval: float, description: str):
+    """Roda `task` numa thread do pool a cada `interval` segundos, começando no startup."""
+    while True:
+        try:
+            await run_in_threadpool(task)
+        except Exception as e:
+            logger.error(f"Erro no agendamento de {description}: {e}", exc_info=True)
+        await asyncio.sleep(interval)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Em segundo plano: a API já aceita requisições enquanto pandas e LangChain são importados
+    if config.STARTUP_WARMUP:
+        threading.Thread(target=_warm_up, name="startup-warmup", daemon=True).start()
+    scheduled = []
+    if config.RESPONSE_CACHE_WARM_SECONDS > 0:
+        scheduled.append(asyncio.create_task(
+            _run_periodically(warm_response_cache, config.RESPONSE_CACHE_WARM_SECONDS, "aquecimento do cache de respostas")
+        ))
+    if config.SNAPSHOT_INTERVAL_SECONDS > 0:
+        # Visões comuns do dashboard pré-calculadas; as rotas servem o snapshot mais recente
+        scheduled.append(asyncio.create_task(
+            _run_periodically(refresh_snapshots, config.SNAPSHOT_INTERVAL_SECONDS, "snapshots de analytics")
+        ))
+    yield
+    for task in scheduled:
+        task.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(ServerTimingMiddleware)
 app.include_router(router)
+app.include_router(job_router)
+app.include_router(webhook_router)
+if config.PROFILING_ENABLED and not config.ADMIN_TOKEN:
+    # A rota executa qualquer outra rota e grava arquivos: nunca fica aberta sem token
+    logger.error("PROFILING_ENABLED=true sem ADMIN_TOKEN; a rota /admin/profile não foi habilitada.")
+elif config.PROFILING_ENABLED:
+    # Importado só quando habilitado: sem a flag, não existe rota nem código de profiling carregado
+    from src.routes.admin_routes import router as admin_router
+    app.include_router(admin_router)
+
+
+# 📊 Métricas Prometheus: tempos por método do JiraClient e por estágio, status do Jira/Databricks e tokens do LLM.
+@app.get("/metrics")
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 if __name__ == "__main__":
     import uvicorn
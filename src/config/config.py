@@ -11,5 +11,90 @@ API_TOKEN_JIRA  = os.getenv("API_TOKEN_JIRA")
 
 
 # Databricks Model Serving
-DATABRICKS_ENDPOINT="https://adb-4450746371403902.2.azuredatabricks.net/serving-endpoints/TesteProvisioned/invocations"
-DATABRICKS_TOKEN="seu_token_do_databricks_aqui"
+DATABRICKS_ENDPOINT=os.getenv("DATABRICKS_ENDPOINT", "https://adb-4450746371403902.2.azuredatabricks.net/serving-endpoints/TesteProvisioned/invocations")
+DATABRICKS_TOKEN=os.getenv("DATABRICKS_TOKEN", "seu_token_do_databricks_aqui")
+# Timeouts (segundos), inferências simultâneas por endpoint e retry em 429/503
+DATABRICKS_CONNECT_TIMEOUT  = float(os.getenv("DATABRICKS_CONNECT_TIMEOUT", "10"))
+DATABRICKS_READ_TIMEOUT     = float(os.getenv("DATABRICKS_READ_TIMEOUT", "300"))
+DATABRICKS_MAX_CONCURRENCY  = int(os.getenv("DATABRICKS_MAX_CONCURRENCY", "4"))
+DATABRICKS_MAX_RETRIES      = int(os.getenv("DATABRICKS_MAX_RETRIES", "3"))
+
+# Cache local (em disco) de changelogs; vazio desativa
+CACHE_DIR             = os.getenv("CACHE_DIR", os.path.join(os.path.dirname(__file__), '..', '..', '.cache'))
+CHANGELOG_CACHE_PATH  = os.getenv("CHANGELOG_CACHE_PATH", os.path.join(CACHE_DIR, 'changelogs.sqlite3'))
+
+# Cache persistente das análises do LLM; vazio desativa
+LLM_CACHE_PATH        = os.getenv("LLM_CACHE_PATH", os.path.join(CACHE_DIR, 'llm_cache.sqlite3'))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "500"))
+LLM_CACHE_MAX_AGE     = float(os.getenv("LLM_CACHE_MAX_AGE", "86400"))
+
+# Concorrência na busca de changelogs do Jira
+JIRA_MAX_IN_FLIGHT = int(os.getenv("JIRA_MAX_IN_FLIGHT", "8"))
+# Quantidade de issues por busca JQL em lote (expand=changelog)
+JIRA_SEARCH_PAGE_SIZE = int(os.getenv("JIRA_SEARCH_PAGE_SIZE", "50"))
+
+# Sessão HTTP do Jira: pool de conexões, retry/backoff e timeouts (segundos)
+JIRA_POOL_SIZE          = int(os.getenv("JIRA_POOL_SIZE", str(max(10, JIRA_MAX_IN_FLIGHT))))
+JIRA_MAX_RETRIES        = int(os.getenv("JIRA_MAX_RETRIES", "5"))
+JIRA_BACKOFF_FACTOR     = float(os.getenv("JIRA_BACKOFF_FACTOR", "0.5"))
+JIRA_CONNECT_TIMEOUT    = float(os.getenv("JIRA_CONNECT_TIMEOUT", "10"))
+JIRA_READ_TIMEOUT       = float(os.getenv("JIRA_READ_TIMEOUT", "60"))
+# "live": Jira real; "record": Jira real gravando as respostas; "replay": só as respostas gravadas (offline).
+# Fora do modo live os caches de changelog e de respostas são ignorados, para gravar e repetir tudo
+JIRA_MODE               = os.getenv("JIRA_MODE", "live")
+JIRA_ARCHIVE_PATH       = os.getenv("JIRA_ARCHIVE_PATH", os.path.join(CACHE_DIR, 'jira_archive.jsonl.gz'))
+
+# Tempo (segundos) até o índice de boards/sprints ser reconstruído
+SPRINT_INDEX_TTL        = float(os.getenv("SPRINT_INDEX_TTL", "600"))
+# "recent": lê só as sprints ativas/fechadas do fim de cada board; "full": histórico completo
+SPRINT_SELECTION_MODE   = os.getenv("SPRINT_SELECTION_MODE", "recent")
+
+# Jobs em background (análises demoradas)
+JOB_MAX_WORKERS         = int(os.getenv("JOB_MAX_WORKERS", "2"))
+JOB_RESULT_TTL          = float(os.getenv("JOB_RESULT_TTL", "3600"))
+
+# Orçamento (estimado em tokens) da tabela agregada enviada ao LLM
+LLM_PROMPT_TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "6000"))
+
+# Webhooks do Jira (jira:issue_updated) e armazenamento local dos eventos de retrabalho
+EVENT_STORE_PATH            = os.getenv("EVENT_STORE_PATH", os.path.join(CACHE_DIR, 'rework_events.sqlite3'))
+# Com webhooks ativos, sprints já sincronizadas são servidas do armazenamento local
+JIRA_WEBHOOKS_ENABLED       = os.getenv("JIRA_WEBHOOKS_ENABLED", "false").lower() in ("1", "true", "yes")
+# Segredo do webhook (assinatura HMAC-SHA256 em X-Hub-Signature); vazio não valida
+JIRA_WEBHOOK_SECRET         = os.getenv("JIRA_WEBHOOK_SECRET", "")
+# Sprint sincronizada há mais tempo que isso (segundos) é buscada de novo no Jira
+EVENT_STORE_RESYNC_SECONDS  = float(os.getenv("EVENT_STORE_RESYNC_SECONDS", "86400"))
+# Campo de sprint da issue no payload do webhook
+JIRA_SPRINT_FIELD           = os.getenv("JIRA_SPRINT_FIELD", "customfield_10020")
+
+# Profiling sob demanda (rota /admin/profile); desligado por padrão, sem nenhum custo
+PROFILING_ENABLED   = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+# Token exigido no cabeçalho X-Admin-Token; sem ele a rota de profiling não é habilitada
+ADMIN_TOKEN         = os.getenv("ADMIN_TOKEN", "")
+PROFILE_DIR         = os.getenv("PROFILE_DIR", os.path.join(CACHE_DIR, 'profiles'))
+
+# Aquecimento no startup da API (em segundo plano): importa pandas/LangChain e hidrata os agregados
+STARTUP_WARMUP      = os.getenv("STARTUP_WARMUP", "true").lower() in ("1", "true", "yes")
+
+# Cache compartilhado das respostas das rotas (SQLite, ex.: .cache/responses.sqlite3); desligado por padrão,
+# pois serve análises com até RESPONSE_CACHE_TTL segundos de atraso
+RESPONSE_CACHE_PATH         = os.getenv("RESPONSE_CACHE_PATH", "")
+RESPONSE_CACHE_TTL          = float(os.getenv("RESPONSE_CACHE_TTL", "900"))
+RESPONSE_CACHE_MAX_ENTRIES  = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "200"))
+# Intervalo (segundos) do aquecimento agendado de boards/sprints no cache; 0 desativa
+RESPONSE_CACHE_WARM_SECONDS = float(os.getenv("RESPONSE_CACHE_WARM_SECONDS", "0"))
+
+# Dashboard: URL da API FastAPI (ex.: http://localhost:8000); vazio chama as rotas no próprio processo
+DASHBOARD_API_URL       = os.getenv("DASHBOARD_API_URL", "")
+DASHBOARD_API_TIMEOUT   = float(os.getenv("DASHBOARD_API_TIMEOUT", "600"))
+
+# Snapshots pré-calculados das visões de analytics (diária e 15 dias; sprint específica e todos os boards)
+SNAPSHOT_PATH               = os.getenv("SNAPSHOT_PATH", os.path.join(CACHE_DIR, 'snapshots.sqlite3'))
+# Intervalo (segundos) entre gerações agendadas; 0 desativa os snapshots
+SNAPSHOT_INTERVAL_SECONDS   = float(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "0"))
+# Valores de num_sprints pré-calculados para as visões de todos os boards (separados por vírgula)
+SNAPSHOT_NUM_SPRINTS        = [int(n) for n in os.getenv("SNAPSHOT_NUM_SPRINTS", "2").split(",") if n.strip()]
+# Pares board:sprint das visões específicas (ex.: "12:345,13:346"); vazio usa a sprint ativa de cada board
+SNAPSHOT_BOARD_SPRINTS      = [
+    tuple(pair.strip().split(":", 1)) for pair in os.getenv("SNAPSHOT_BOARD_SPRINTS", "").split(",") if ":" in pair
+]
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Header, HTTPException, Request
+import asyncio
+import hmac
+import httpx
+import logging
+import re
+
+from src.utils.profiler import SamplingProfiler
+import src.config.config as config
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin")
+
+# Um perfil por vez: as amostras cobrem todas as threads da aplicação
+_profile_lock = asyncio.Lock()
+
+
+# 🔬 Executa uma chamada de rota (ex.: /JIRA_all_analytics?num_sprints=2) sob o profiler por amostragem.
+# 🔧 Só existe com PROFILING_ENABLED=true; devolve a atribuição do tempo (HTTP Jira/LLM, pandas, CrewAI...) e grava as pilhas.
+@router.post("/profile")
+async def profile_route(
+    request: Request,
+    path: str,
+    interval_ms: float = 5.0,
+    store: bool = True,
+    x_admin_token: str = Header(default="")
+):
+    if not config.ADMIN_TOKEN or not hmac.compare_digest(x_admin_token.encode(), config.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Token de administração inválido")
+    if not path.startswith("/") or path.startswith("/admin"):
+        raise HTTPException(status_code=400, detail="Informe o caminho de uma rota da API, ex.: /JIRA_all_analytics?num_sprints=2")
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="Já existe um profiling em andamento")
+
+    async with _profile_lock:
+        try:
+            profiler = SamplingProfiler(interval=max(interval_ms, 1.0) / 1000)
+            transport = httpx.ASGITransport(app=request.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://profiler", timeout=None) as client:
+                with profiler:
+                    response = await client.get(path)
+            report = profiler.report()
+            report["rota"] = path
+            report["status_code"] = response.status_code
+            report["server_timing"] = response.headers.get("server-timing")
+            if store:
+                name = re.sub(r"[^A-Za-z0-9_]+", "_", path.split("?", 1)[0]).strip("_") or "raiz"
+                report["arquivos"] = profiler.save(config.PROFILE_DIR, name)
+            return report
+        except Exception as e:
+            logger.error(f"Erro ao executar o profiling da rota {path}: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=str(e))
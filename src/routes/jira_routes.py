@@ -1,287 +1,605 @@
-from fastapi import APIRouter, HTTPException
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
+from datetime import datetime, timedelta
+from typing import Optional
+import json
 import logging
+import threading
+import time
 
 from src.utils.jira_client import JiraClient
-from src.utils.rework_search import filter_reprovado_entries
-from src.config.config import BASE_URL, EMAIL, API_TOKEN_JIRA
+from src.utils.changelog_cache import ChangelogCache
+from src.utils.changelog_fetcher import collect_rework_entries, iter_prefetched
+from src.utils.sprint_index import SprintIndex
+from src.utils.rework_search import ReworkEventTable
+from src.utils.rework_aggregates import ReworkAggregateStore
+from src.utils.event_store import ReworkEventStore
+from src.utils.llm_cache import content_hash
+from src.utils.response_cache import ResponseCache
+from src.utils.snapshot_store import SnapshotStore
+from src.utils.metrics import request_timings, stage
+import src.config.config as config
+
+# Objetos compartilhados pelas rotas (e pelo Streamlit), criados sob demanda na
+# primeira requisição ou no aquecimento do startup, e não na importação do módulo
+_resources = {}
+_resources_lock = threading.RLock()
+
+
+def _resource(name: str, factory):
+    """Devolve o objeto `name`, criando-o uma única vez mesmo com requisições concorrentes."""
+    if name in _resources:
+        return _resources[name]
+    with _resources_lock:
+        if name not in _resources:
+            _resources[name] = factory()
+        return _resources[name]
+
+
+def get_jira_client() -> JiraClient:
+    """Cliente Jira configurado com as variáveis centrais de config."""
+    def build():
+        changelog_cache = ChangelogCache(config.CHANGELOG_CACHE_PATH) if config.CHANGELOG_CACHE_PATH else None
+        return JiraClient(
+            config.BASE_URL,
+            config.EMAIL,
+            config.API_TOKEN_JIRA,
+            changelog_cache=changelog_cache,
+            pool_size=config.JIRA_POOL_SIZE,
+            max_retries=config.JIRA_MAX_RETRIES,
+            backoff_factor=config.JIRA_BACKOFF_FACTOR,
+            timeout=(config.JIRA_CONNECT_TIMEOUT, config.JIRA_READ_TIMEOUT),
+            mode=config.JIRA_MODE,
+            archive_path=config.JIRA_ARCHIVE_PATH
+        )
+    return _resource("jira_client", build)
+
+
+def get_sprint_index() -> SprintIndex:
+    """Índice de boards/sprints compartilhado por todas as rotas."""
+    return _resource("sprint_index", lambda: SprintIndex(
+        get_jira_client(), ttl_seconds=config.SPRINT_INDEX_TTL, max_workers=config.JIRA_MAX_IN_FLIGHT
+    ))
+
+
+def get_event_store() -> Optional[ReworkEventStore]:
+    """Eventos de retrabalho persistidos (crawl + webhooks do Jira); None se EVENT_STORE_PATH estiver vazio."""
+    return _resource("event_store", lambda: ReworkEventStore(config.EVENT_STORE_PATH) if config.EVENT_STORE_PATH else None)
+
+
+def get_rework_aggregates() -> ReworkAggregateStore:
+    """Agregados de retrabalho por dia/sprint/desenvolvedor, hidratados do armazenamento local na criação."""
+    def build():
+        aggregates = ReworkAggregateStore()
+        event_store = get_event_store()
+        if event_store is not None:
+            aggregates.ingest(*event_store.load())
+        return aggregates
+    return _resource("rework_aggregates", build)
+
+
+def _caching_allowed() -> bool:
+    # Em gravação/replay toda rota precisa chegar ao Jira (ou ao arquivo), senão o arquivo fica incompleto
+    return config.JIRA_MODE == "live"
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Cache das respostas compartilhado entre workers e dashboards; None se RESPONSE_CACHE_PATH estiver vazio ou fora do modo live."""
+    return _resource("response_cache", lambda: ResponseCache(
+        config.RESPONSE_CACHE_PATH, ttl=config.RESPONSE_CACHE_TTL, max_entries=config.RESPONSE_CACHE_MAX_ENTRIES
+    ) if config.RESPONSE_CACHE_PATH and _caching_allowed() else None)
+
+
+def get_snapshot_store() -> Optional[SnapshotStore]:
+    """Snapshots das visões de analytics; None se o agendamento (SNAPSHOT_INTERVAL_SECONDS) estiver desligado."""
+    # Sem duas gerações seguidas (agendador parado ou falhando), o snapshot deixa de ser servido
+    return _resource("snapshot_store", lambda: SnapshotStore(
+        config.SNAPSHOT_PATH, max_age=2 * config.SNAPSHOT_INTERVAL_SECONDS
+    ) if config.SNAPSHOT_PATH and config.SNAPSHOT_INTERVAL_SECONDS > 0 and _caching_allowed() else None)
+
+
+def warm_up():
+    """
+    Adianta o custo da primeira requisição: cria o cliente e os agregados
+    (hidratando-os do armazenamento local) e importa pandas, o agente e o cliente do LLM.
+    """
+    get_sprint_index()
+    get_rework_aggregates()
+    import src.agents.rework_agent  # noqa: F401
+    import src.utils.custom_llm  # noqa: F401
+
 
-# Configura o cliente Jira usando variáveis centrais de config
-jira_client = JiraClient(BASE_URL, EMAIL, API_TOKEN_JIRA)
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+
+def _iter_board_issues(board_id, sprint_id, memberships: list = None):
+    """
+    Percorre as issues de um board/sprint, já pedindo a próxima página enquanto a
+    atual é processada. `memberships` (opcional) recebe os pares (issue, sprint).
+    """
+    for page in iter_prefetched(get_jira_client().get_single_board(board_id, sprint_id)):
+        if memberships is not None:
+            memberships.extend((issue.get("key"), sprint_id) for issue in page)
+        yield from page
+
+
+def _iter_sprint_issues(selected_sprints: list, progress=None, memberships: list = None):
+    """Percorre sob demanda as issues de cada board/sprint selecionado."""
+    for sprint in selected_sprints:
+        sprint_id = sprint.get("id")
+        for board_id in sprint.get("boards", []):
+            yield from _iter_board_issues(board_id, sprint_id, memberships)
+            if progress is not None:
+                progress.increment("boards_scanned")
+
+
+def _record_crawl(events: ReworkEventTable, memberships: list, crawled_sprints: list = ()):
+    """
+    Atualiza os agregados e o armazenamento local com o resultado de um crawl.
+    `crawled_sprints` são as sprints percorridas em todos os seus boards.
+    """
+    get_rework_aggregates().ingest(events, memberships, crawled_sprints=crawled_sprints)
+    event_store = get_event_store()
+    if event_store is not None:
+        event_store.replace_issues(events, memberships, crawled_sprints)
+
+
+def _collect_and_aggregate(selected_sprints: list, progress=None) -> ReworkEventTable:
+    """Coleta no Jira os eventos de retrabalho das sprints e marca as sprints como sincronizadas."""
+    memberships = []
+    with stage("crawl_changelogs"):
+        events = collect_rework_entries(get_jira_client(), _iter_sprint_issues(selected_sprints, progress, memberships), progress=progress)
+    with stage("agregados"):
+        _record_crawl(events, memberships, [sprint.get("id") for sprint in selected_sprints])
+    event_store = get_event_store()
+    if event_store is not None:
+        for sprint in selected_sprints:
+            event_store.mark_synced(sprint.get("id"))
+    return events
+
+
+def _collect_board_and_aggregate(board_id, sprint_id, whole_sprint: bool = False) -> ReworkEventTable:
+    """Coleta no Jira os eventos de um board/sprint; `whole_sprint` indica que a sprint só existe neste board."""
+    memberships = []
+    with stage("crawl_changelogs"):
+        events = collect_rework_entries(get_jira_client(), _iter_board_issues(board_id, sprint_id, memberships))
+    with stage("agregados"):
+        _record_crawl(events, memberships, [sprint_id] if whole_sprint else [])
+    event_store = get_event_store()
+    if event_store is not None and whole_sprint:
+        event_store.mark_synced(sprint_id)
+    return events
+
+
+def _gather_board_events(board_id, sprint_id) -> ReworkEventTable:
+    """
+    Eventos de um board/sprint, pela mesma regra de `_gather_events`: com
+    webhooks ativos e a sprint sincronizada, vêm do armazenamento local. Ele
+    guarda issue -> sprint, sem o board, então só responde por sprints que
+    pertencem apenas a este board; as demais são sempre buscadas no Jira.
+    """
+    event_store = get_event_store()
+    if event_store is None or not config.JIRA_WEBHOOKS_ENABLED:
+        return _collect_board_and_aggregate(board_id, sprint_id)
+    whole_sprint = [str(b) for b in get_sprint_index().boards_for_sprint(sprint_id)] == [str(board_id)]
+    if whole_sprint and event_store.synced_sprints([sprint_id], max_age=config.EVENT_STORE_RESYNC_SECONDS):
+        with stage("armazenamento_local"):
+            events, _ = event_store.load([sprint_id])
+        return events
+    return _collect_board_and_aggregate(board_id, sprint_id, whole_sprint)
+
+
+def _gather_events(selected_sprints: list, progress=None) -> ReworkEventTable:
+    """
+    Eventos de retrabalho das sprints. Com webhooks ativos, sprints já
+    sincronizadas vêm do armazenamento local (mantido pelos webhooks) e só as
+    lacunas são buscadas no Jira; sem webhooks, tudo é buscado no Jira.
+    """
+    event_store = get_event_store()
+    if event_store is None or not config.JIRA_WEBHOOKS_ENABLED:
+        return _collect_and_aggregate(selected_sprints, progress)
+    synced = event_store.synced_sprints(
+        [s.get("id") for s in selected_sprints], max_age=config.EVENT_STORE_RESYNC_SECONDS
+    )
+    gaps = [s for s in selected_sprints if str(s.get("id")) not in synced]
+    events = ReworkEventTable()
+    if synced:
+        with stage("armazenamento_local"):
+            stored, _ = event_store.load(synced.keys())
+        events.extend(stored)
+    if gaps:
+        logger.info(f"Buscando no Jira {len(gaps)} sprint(s) sem sincronização local; {len(synced)} servida(s) do armazenamento.")
+        events.extend(_collect_and_aggregate(gaps, progress))
+    return events
+
+
+def _cached(name: str, params: dict, compute, refresh: bool = False, cacheable=None):
+    """Resposta de uma rota pelo cache compartilhado (ou calculada direto, se ele estiver desativado)."""
+    cache = get_response_cache()
+    if cache is None:
+        return compute()
+    return cache.get_or_compute(content_hash(name, params), compute, refresh=refresh, cacheable=cacheable)
+
+
+def _analysis_complete(response: dict) -> bool:
+    """Análises em que o agente falhou (sem narrativa) não vão para o cache."""
+    return response.get("analysis", {}).get("llm_analysis") != "Análise não disponível"
+
+
+def _today() -> str:
+    return datetime.now().date().isoformat()
+
+
+def _list_boards(refresh: bool = False) -> dict:
+    return _cached("boards", {}, lambda: {"boards": get_sprint_index().boards()}, refresh=refresh)
+
+
+def _list_sprints(board_id: str, refresh: bool = False) -> dict:
+    return _cached(
+        "board_sprints", {"board_id": str(board_id)},
+        lambda: {"board_id": board_id, "sprints": get_sprint_index().sprints_for_board(board_id)},
+        refresh=refresh
+    )
+
+
+def warm_response_cache():
+    """
+    Aquecimento agendado: reconstrói o índice de sprints e regrava no cache a
+    lista de boards e as sprints de cada board, para o primeiro carregamento
+    do dashboard não esperar pelo Jira.
+    """
+    get_sprint_index().invalidate()
+    boards = _list_boards(refresh=True).get("boards", [])
+    for board in boards:
+        _list_sprints(str(board.get("id")), refresh=True)
+    logger.info(f"Cache de respostas aquecido: {len(boards)} boards.")
+
+
+# Visões de analytics servidas por snapshot/cache: nome -> (cálculo a partir dos parâmetros, pode ir para o cache?)
+_VIEWS = {
+    "all_analytics": (lambda p: build_all_analytics(p["num_sprints"]), _analysis_complete),
+    "daily_all_analytics": (lambda p: _daily_all_analytics(p["num_sprints"]), None),
+    "analitycs_with_changelogs": (lambda p: _analitycs_with_changelogs(p["board_id"], p["sprint_id"]), _analysis_complete),
+    "analitycs_daily": (lambda p: _analitycs_daily(p["board_id"], p["sprint_id"]), None),
+}
+
+
+def _stored_view(view: str, params: dict):
+    """Resultado já calculado da visão (snapshot ou cache de respostas), sem calcular nada."""
+    key = content_hash(view, params)
+    snapshots = get_snapshot_store()
+    snapshot = snapshots.get(key) if snapshots is not None else None
+    if snapshot is not None:
+        return snapshot
+    cache = get_response_cache()
+    return cache.get(key) if cache is not None else None
+
+
+def _generate_view(view: str, params: dict):
+    """Calcula a visão ignorando os caches e grava o resultado no cache de respostas e como snapshot."""
+    compute, cacheable = _VIEWS[view]
+    start = time.perf_counter()
+    result = _cached(view, params, lambda: compute(params), refresh=True, cacheable=cacheable)
+    snapshots = get_snapshot_store()
+    if snapshots is not None and (cacheable is None or cacheable(result)):
+        return snapshots.put(content_hash(view, params), view, params, result, time.perf_counter() - start)
+    return result
+
+
+def _serve_view(view: str, params: dict, fresh: bool = False):
+    """
+    Resposta de uma visão: o snapshot mais recente (com `generated_at`), se
+    houver; senão o cache de respostas ou o cálculo. `fresh=True` recalcula e
+    atualiza o snapshot.
+    """
+    if fresh:
+        return _generate_view(view, params)
+    snapshots = get_snapshot_store()
+    snapshot = snapshots.get(content_hash(view, params)) if snapshots is not None else None
+    if snapshot is not None:
+        return snapshot
+    compute, cacheable = _VIEWS[view]
+    return _cached(view, params, lambda: compute(params), cacheable=cacheable)
+
+
+def snapshot_views() -> list:
+    """
+    (visão, parâmetros) pré-calculados pelo agendador: diária e 15 dias, para
+    todos os boards (cada num_sprints de SNAPSHOT_NUM_SPRINTS) e para cada
+    board/sprint de SNAPSHOT_BOARD_SPRINTS (ou a sprint ativa de cada board).
+    """
+    views = []
+    for num_sprints in config.SNAPSHOT_NUM_SPRINTS:
+        views.append(("all_analytics", {"num_sprints": num_sprints}))
+        views.append(("daily_all_analytics", {"num_sprints": num_sprints, "day": _today()}))
+    pairs = config.SNAPSHOT_BOARD_SPRINTS or [
+        (str(board_id), str(sprint.get("id")))
+        for sprint in get_sprint_index().sprints(states=["active"])
+        for board_id in sprint.get("boards", [])
+    ]
+    for board_id, sprint_id in pairs:
+        params = {"board_id": board_id, "sprint_id": sprint_id}
+        views.append(("analitycs_with_changelogs", params))
+        views.append(("analitycs_daily", {**params, "day": _today()}))
+    return views
+
+
+def refresh_snapshots() -> dict:
+    """Gera de novo todas as visões agendadas; a falha de uma não impede as demais."""
+    start = time.perf_counter()
+    generated, failed = 0, 0
+    for view, params in snapshot_views():
+        cacheable = _VIEWS[view][1]
+        try:
+            result = _generate_view(view, params)
+        except Exception as e:
+            logger.error(f"Erro ao gerar o snapshot {view} {params}: {e}", exc_info=True)
+            failed += 1
+            continue
+        if cacheable is not None and not cacheable(result):
+            # Ex.: o LLM falhou; o snapshot anterior (se houver) continua valendo
+            logger.warning(f"Snapshot {view} {params} incompleto; mantido o anterior.")
+            failed += 1
+        else:
+            generated += 1
+    logger.info(f"Snapshots gerados: {generated} ({failed} com erro) em {time.perf_counter() - start:.1f}s.")
+    return {"generated": generated, "failed": failed}
+
+
+def build_all_analytics(num_sprints: int, progress=None) -> dict:
+    """
+    Análise de retrabalho dos últimos N sprints de todos os boards. Usada pela
+    rota síncrona e pelos jobs em background; `progress` (opcional) recebe o
+    estágio atual e os contadores de boards/issues processados.
+    """
+    try:
+        if progress is not None:
+            progress.update(stage="descobrindo sprints")
+        with stage("descoberta_sprints"):
+            selected_sprints = get_sprint_index().latest_sprints(num_sprints, mode=config.SPRINT_SELECTION_MODE)
+        if progress is not None:
+            progress.update(stage="buscando changelogs", sprints_selected=len(selected_sprints))
+        aggregated_cards = _gather_events(selected_sprints, progress)
+        sprint_info = [{"sprint_id": s.get("id"), "boards": s.get("boards", [])} for s in selected_sprints]
+        if progress is not None:
+            progress.update(stage="gerando análise")
+        from src.agents.rework_agent import create_rework_agent
+        rework_analysis = create_rework_agent(aggregated_cards)
+        return {
+            "sprints": sprint_info,
+            "analysis": {
+                "llm_analysis": rework_analysis.get("llm_analysis", "Análise não disponível"),
+                "charts_data": rework_analysis.get("charts_data", {
+                    "conclusoes": [],
+                    "reprovacoes": [],
+                    "metrics": {
+                        "total_concluidos": 0,
+                        "total_reprovados": 0,
+                        "total_reprovacoes": 0
+                    }
+                })
+            }
+        }
+    except Exception as e:
+        logger.error(f"Erro ao buscar analytics para todos os boards e sprints: {e}", exc_info=True)
+        raise Exception(str(e))
+
+
 # 🔍 Analisa todos os boards e últimos N sprints.
 # 🔄 Busca todas as issues de cada board/sprint, aplica análise de retrabalho.
 @router.get("/JIRA_all_analytics")
-def get_all_analytics(num_sprints: int = 2):
-    def process_all_analytics(num_sprints: int) -> dict:
-        try:
-            boards = jira_client.get_all_boards()
-            unique_sprints = {}
-            for board in boards:
-                board_id = board.get("id")
-                try:
-                    sprints = jira_client.get_sprints_by_board(board_id)
-                except Exception as e:
-                    if "O quadro não aceita sprints" in str(e):
-                        logger.warning(f"Board {board_id} não aceita sprints. Pulando esse board.")
-                        continue
-                    else:
-                        raise
-                for sprint in sprints:
-                    sprint_id = sprint.get("id")
-                    if sprint_id not in unique_sprints:
-                        sprint["boards"] = [board_id]
-                        unique_sprints[sprint_id] = sprint
-                    else:
-                        if board_id not in unique_sprints[sprint_id].get("boards", []):
-                            unique_sprints[sprint_id]["boards"].append(board_id)
-            all_sprints = list(unique_sprints.values())
-            if all_sprints:
-                if "startDate" in all_sprints[0] and all_sprints[0].get("startDate"):
-                    sorted_sprints = sorted(all_sprints, key=lambda s: s.get("startDate", ""), reverse=True)
-                else:
-                    sorted_sprints = all_sprints
-                selected_sprints = sorted_sprints[:num_sprints]
-            else:
-                selected_sprints = []
-            aggregated_cards = []
-            sprint_info = []
-            for sprint in selected_sprints:
-                sprint_id = sprint.get("id")
-                boards_list = sprint.get("boards", [])
-                for board_id in boards_list:
-                    board_data = jira_client.get_single_board(board_id, sprint_id)
-                    issues = board_data.get("issues", [])
-                    for issue in issues:
-                        issue_key = issue.get("key")
-                        fields = issue.get("fields", {})
-                        assignee = fields.get("assignee") or {}
-                        dev = fields.get("customfield_10172", "Não definido")
-                        sp = fields.get("customfield_10106", 0)
-                        if not issue_key:
-                            continue
-                        try:
-                            changelog_response = jira_client.get_issue_changelog(issue_key)
-                            filtered = filter_reprovado_entries(
-                                issue_key=issue_key,
-                                dev=dev,
-                                sp=sp,
-                                changelog_data=changelog_response,
-                                assignee=assignee
-                            )
-                            aggregated_cards.extend(filtered)
-                        except Exception as ex:
-                            logger.error(f"Falha ao buscar changelog para a issue {issue_key}: {ex}", exc_info=True)
-                            continue
-                sprint_info.append({"sprint_id": sprint_id, "boards": boards_list})
-            from src.agents.rework_agent import create_rework_agent
-            rework_analysis = create_rework_agent(aggregated_cards)
-            return {
-                "sprints": sprint_info,
-                "analysis": {
-                    "llm_analysis": rework_analysis.get("llm_analysis", "Análise não disponível"),
-                    "charts_data": rework_analysis.get("charts_data", {
-                        "conclusoes": [],
-                        "reprovacoes": [],
-                        "metrics": {
-                            "total_concluidos": 0,
-                            "total_reprovados": 0,
-                            "total_reprovacoes": 0
-                        }
-                    })
-                }
-            }
-        except Exception as e:
-            logger.error(f"Erro ao buscar analytics para todos os boards e sprints: {e}", exc_info=True)
-            raise Exception(str(e))
+def get_all_analytics(num_sprints: int = 2, fresh: bool = False):
     try:
-        return process_all_analytics(num_sprints)
+        return _serve_view("all_analytics", {"num_sprints": num_sprints}, fresh=fresh)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# 📆 Analisa todos os boards e últimos N sprints, mas apenas os cards concluídos hoje.
-# 🔄 Agrupa os cards finalizados no dia atual e calcula os Story Points entregues hoje.
-@router.get("/JIRA_daily_all_analytics")
-def get_daily_all_analytics(num_sprints: int = 2):
+def iter_all_analytics(num_sprints: int, fresh: bool = False):
+    """
+    Versão incremental de `build_all_analytics`: gera um evento por etapa, para
+    que o dashboard desenhe métricas e gráficos antes do fim do crawl.
+      - {"type": "sprints", ...}: sprints selecionadas;
+      - {"type": "partial", ...}: `charts_data` acumulado após cada sprint;
+      - {"type": "narrative", "delta": ...}: trechos da narrativa do LLM, conforme são gerados;
+      - {"type": "final", ...}: análise completa, com a narrativa inteira;
+      - {"type": "error", ...}: falha. Se só a narrativa falhar, vem antes de um
+        `final` sem narrativa, mas com as métricas e gráficos já calculados.
+    `fresh=True` ignora o snapshot e o cache de respostas e refaz a análise.
+    """
     try:
-        boards = jira_client.get_all_boards()
-        unique_sprints = {}
-        for board in boards:
-            board_id = board.get("id")
-            try:
-                sprints = jira_client.get_sprints_by_board(board_id)
-            except Exception as e:
-                if "O quadro não aceita sprints" in str(e):
-                    logger.warning(f"Board {board_id} não aceita sprints. Pulando esse board.")
-                    continue
-                else:
-                    raise
-            for sprint in sprints:
-                sprint_id = sprint.get("id")
-                if sprint_id not in unique_sprints:
-                    sprint["boards"] = [board_id]
-                    unique_sprints[sprint_id] = sprint
-                else:
-                    if board_id not in unique_sprints[sprint_id].get("boards", []):
-                        unique_sprints[sprint_id]["boards"].append(board_id)
-        all_sprints = list(unique_sprints.values())
-        if all_sprints:
-            if "startDate" in all_sprints[0] and all_sprints[0].get("startDate"):
-                sorted_sprints = sorted(all_sprints, key=lambda s: s.get("startDate", ""), reverse=True)
+        # Mesma análise já calculada (pela rota síncrona ou por outro dashboard): entrega direto
+        cache = get_response_cache()
+        cache_key = content_hash("all_analytics", {"num_sprints": num_sprints})
+        cached = _stored_view("all_analytics", {"num_sprints": num_sprints}) if not fresh else None
+        if cached is not None:
+            yield {"type": "sprints", "sprints": cached["sprints"]}
+            yield {"type": "final", **cached, "timings": {}}
+            return
+
+        with stage("descoberta_sprints"):
+            selected_sprints = get_sprint_index().latest_sprints(num_sprints, mode=config.SPRINT_SELECTION_MODE)
+        sprint_info = [{"sprint_id": s.get("id"), "boards": s.get("boards", [])} for s in selected_sprints]
+        yield {"type": "sprints", "sprints": sprint_info}
+
+        from src.agents.rework_agent import compute_rework_metrics, stream_rework_agent
+        aggregated_cards = ReworkEventTable()
+        partial = compute_rework_metrics(aggregated_cards)
+        for position, sprint in enumerate(selected_sprints, start=1):
+            aggregated_cards.extend(_gather_events([sprint]))
+            partial = compute_rework_metrics(aggregated_cards)
+            yield {
+                "type": "partial",
+                "sprint_id": sprint.get("id"),
+                "sprints_done": position,
+                "sprints_total": len(selected_sprints),
+                "charts_data": partial.get("charts_data", {})
+            }
+
+        rework_analysis = {}
+        for piece in stream_rework_agent(aggregated_cards):
+            if "delta" in piece:
+                yield {"type": "narrative", "delta": piece["delta"]}
             else:
-                sorted_sprints = all_sprints
-            selected_sprints = sorted_sprints[:num_sprints]
-        else:
-            selected_sprints = []
+                rework_analysis = piece
+        if "error" in rework_analysis:
+            # Falha do LLM não invalida o crawl: avisa e entrega as métricas já calculadas
+            yield {"type": "error", "detail": f"Erro ao gerar a narrativa: {rework_analysis['error']}"}
+            rework_analysis = {"charts_data": partial.get("charts_data", {})}
+        result = {
+            "sprints": sprint_info,
+            "analysis": {
+                "llm_analysis": str(rework_analysis.get("llm_analysis", "Análise não disponível")),
+                "charts_data": rework_analysis.get("charts_data", {})
+            }
+        }
+        if cache is not None and _analysis_complete(result):
+            cache.put(cache_key, result)
+        yield {
+            "type": "final",
+            **result,
+            # Tempo (ms) por estágio; nas respostas comuns vai no cabeçalho Server-Timing
+            "timings": {name: round(seconds * 1000, 1) for name, seconds in (request_timings() or {}).items()}
+        }
+    except Exception as e:
+        logger.error(f"Erro no streaming de analytics para todos os boards e sprints: {e}", exc_info=True)
+        yield {"type": "error", "detail": str(e)}
 
-        aggregated_cards = []
-        for sprint in selected_sprints:
-            sprint_id = sprint.get("id")
-            boards_list = sprint.get("boards", [])
-            for board_id in boards_list:
-                board_data = jira_client.get_single_board(board_id, sprint_id)
-                issues = board_data.get("issues", [])
-                for issue in issues:
-                    issue_key = issue.get("key")
-                    if not issue_key:
-                        continue
-                    fields = issue.get("fields", {})
-                    assignee = fields.get("assignee") or {}
-                    dev = fields.get("customfield_10172", "Não definido")
-                    sp = fields.get("customfield_10106", 0)
-                    try:
-                        changelog_response = jira_client.get_issue_changelog(issue_key)
-                        filtered = filter_reprovado_entries(
-                            issue_key=issue_key,
-                            dev=dev,
-                            sp=sp,
-                            changelog_data=changelog_response,
-                            assignee=assignee
-                        )
-                        aggregated_cards.extend(filtered)
-                    except Exception as ex:
-                        logger.error(f"Falha ao buscar changelog para a issue {issue_key}: {ex}", exc_info=True)
-                        continue
-
-        today_date = datetime.now().date()
-        start_date = datetime.combine(today_date, datetime.min.time())
-        end_date = datetime.combine(today_date, datetime.max.time())
 
-        from src.agents.rework_agent import create_rework_agent
-        rework_analysis = create_rework_agent(aggregated_cards, start_date=start_date, end_date=end_date)
-        concl_cards = rework_analysis.get("charts_data", {}).get("conclusoes", [])
-        total_story_points = sum(float(item.get("sp", 0)) for item in concl_cards)
-        return {"daily_concluded_cards": concl_cards, "total_story_points": total_story_points}
+# 📡 Mesma análise de /JIRA_all_analytics, mas em streaming (NDJSON, um evento por linha).
+# 🔄 Envia o `charts_data` parcial a cada sprint processada e a narrativa do LLM token a token.
+@router.get("/JIRA_all_analytics/stream")
+async def stream_all_analytics(request: Request, num_sprints: int = 2, fresh: bool = False):
+    async def ndjson():
+        events = iter_all_analytics(num_sprints, fresh=fresh)
+        try:
+            async for event in iterate_in_threadpool(events):
+                # Cliente desconectou: para o crawl e a geração do LLM
+                if await request.is_disconnected():
+                    logger.info("Cliente desconectou do streaming de analytics; cancelando.")
+                    break
+                yield json.dumps(jsonable_encoder(event), ensure_ascii=False) + "\n"
+        finally:
+            try:
+                events.close()
+            except ValueError:
+                # Gerador ainda em execução na thread; é encerrado quando ela devolver o controle
+                pass
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+def _daily_all_analytics(num_sprints: int) -> dict:
+    with stage("descoberta_sprints"):
+        selected_sprints = get_sprint_index().latest_sprints(num_sprints, mode=config.SPRINT_SELECTION_MODE)
+    aggregated_cards = _gather_events(selected_sprints)
+
+    today_date = datetime.now().date()
+    start_date = datetime.combine(today_date, datetime.min.time())
+    end_date = datetime.combine(today_date, datetime.max.time())
+
+    from src.agents.rework_agent import compute_rework_metrics
+    rework_analysis = compute_rework_metrics(aggregated_cards, start_date=start_date, end_date=end_date)
+    concl_cards = rework_analysis.get("charts_data", {}).get("conclusoes", [])
+    total_story_points = sum(float(item.get("sp") or 0) for item in concl_cards)
+    return {"daily_concluded_cards": concl_cards, "total_story_points": total_story_points}
+
+
+# 📆 Analisa todos os boards e últimos N sprints, mas apenas os cards concluídos hoje.
+# 🔄 Agrupa os cards finalizados no dia atual e calcula os Story Points entregues hoje.
+@router.get("/JIRA_daily_all_analytics")
+def get_daily_all_analytics(num_sprints: int = 2, fresh: bool = False):
+    try:
+        return _serve_view("daily_all_analytics", {"num_sprints": num_sprints, "day": _today()}, fresh=fresh)
     except Exception as e:
         logger.error(f"Erro ao buscar daily analytics para todos os boards e sprints: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _analitycs_with_changelogs(board_id: str, sprint_id: str) -> dict:
+    all_reprovados = _gather_board_events(board_id, sprint_id)
+    from src.agents.rework_agent import create_rework_agent
+    rework_analysis = create_rework_agent(all_reprovados)
+    return {
+        "board_id": board_id,
+        "sprint_id": sprint_id,
+        "analysis": {
+            "llm_analysis": rework_analysis.get("llm_analysis", "Análise não disponível"),
+            "charts_data": rework_analysis.get("charts_data", {
+                "conclusoes": [],
+                "reprovacoes": [],
+                "metrics": {"total_concluidos": 0, "total_reprovados": 0, "total_reprovações": 0}
+            })
+        }
+    }
+
+
 # 🔍 Analisa um board e sprint específicos, incluindo histórico de mudanças (changelogs).
 # 🔄 Identifica entradas de retrabalho, status reprovado e movimentações.
 @router.get("/JIRA_analitycs_with_changelogs")
-def get_analitycs_with_changelogs(board_id: str, sprint_id: str) -> dict:
+def get_analitycs_with_changelogs(board_id: str, sprint_id: str, fresh: bool = False) -> dict:
     try:
-        board_data = jira_client.get_single_board(board_id, sprint_id)
-        issues = board_data.get("issues", [])
-        all_reprovados = []
-        issues_with_changelogs = []
-        for issue in issues:
-            issue_key = issue.get("key")
-            fields = issue.get("fields", {})
-            assignee = fields.get("assignee", {})
-            dev = fields.get("customfield_10172", "Não definido")
-            sp = fields.get("customfield_10106", 0)
-            if not issue_key:
-                continue
-            try:
-                changelog_response = jira_client.get_issue_changelog(issue_key)
-                filtered = filter_reprovado_entries(
-                    issue_key=issue_key,
-                    dev=dev,
-                    sp=sp,
-                    changelog_data=changelog_response,
-                    assignee=assignee
-                )
-                issues_with_changelogs.append({"issue": issue, "reprovado_entries": filtered})
-                all_reprovados.extend(filtered)
-            except Exception as ex:
-                logger.error(f"Falha ao buscar changelog para a issue {issue_key}: {ex}", exc_info=True)
-                continue
-        from src.agents.rework_agent import create_rework_agent
-        rework_analysis = create_rework_agent(all_reprovados)
-        return {
-            "board_id": board_id,
-            "sprint_id": sprint_id,
-            "analysis": {
-                "llm_analysis": rework_analysis.get("llm_analysis", "Análise não disponível"),
-                "charts_data": rework_analysis.get("charts_data", {
-                    "conclusoes": [],
-                    "reprovacoes": [],
-                    "metrics": {"total_concluidos": 0, "total_reprovados": 0, "total_reprovações": 0}
-                })
-            }
-        }
+        return _serve_view("analitycs_with_changelogs", {"board_id": str(board_id), "sprint_id": str(sprint_id)}, fresh=fresh)
     except Exception as e:
         logger.error(f"Erro durante a análise com changelogs: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _analitycs_daily(board_id: str, sprint_id: str) -> dict:
+    aggregated_cards = _gather_board_events(board_id, sprint_id)
+
+    today_date = datetime.now().date()
+    start_date = datetime.combine(today_date, datetime.min.time())
+    end_date = datetime.combine(today_date, datetime.max.time())
+
+    from src.agents.rework_agent import compute_rework_metrics
+    rework_analysis = compute_rework_metrics(aggregated_cards, start_date=start_date, end_date=end_date)
+
+    concl_cards = rework_analysis.get("charts_data", {}).get("conclusoes", [])
+    total_story_points = sum(float(item.get("sp") or 0) for item in concl_cards)
+    return {"concluded_cards": concl_cards, "total_story_points": total_story_points}
+
+
 # 📆 Analisa um board e sprint específicos, considerando apenas os cards concluídos hoje.
 # 🔄 Filtra os dados por data atual e calcula Story Points entregues.
 @router.get("/JIRA_analitycs_daily")
-def get_analitycs_daily(board_id: str, sprint_id: str) -> dict:
+def get_analitycs_daily(board_id: str, sprint_id: str, fresh: bool = False) -> dict:
     try:
-        board_data = jira_client.get_single_board(board_id, sprint_id)
-        issues = board_data.get("issues", [])
-        aggregated_cards = []
-        for issue in issues:
-            issue_key = issue.get("key")
-            if not issue_key:
-                continue
-            fields = issue.get("fields", {})
-            assignee = fields.get("assignee") or {}
-            dev = fields.get("customfield_10172", "Não definido")
-            sp = fields.get("customfield_10106", 0)
-            try:
-                changelog_response = jira_client.get_issue_changelog(issue_key)
-                filtered = filter_reprovado_entries(
-                    issue_key=issue_key,
-                    dev=dev,
-                    sp=sp,
-                    changelog_data=changelog_response,
-                    assignee=assignee
-                )
-                aggregated_cards.extend(filtered)
-            except Exception as ex:
-                logger.error(f"Falha ao buscar changelog para a issue {issue_key}: {ex}", exc_info=True)
-                continue
-
-        today_date = datetime.now().date()
-        start_date = datetime.combine(today_date, datetime.min.time())
-        end_date = datetime.combine(today_date, datetime.max.time())
-
-        from src.agents.rework_agent import create_rework_agent
-        rework_analysis = create_rework_agent(aggregated_cards, start_date=start_date, end_date=end_date)
-
-        concl_cards = rework_analysis.get("charts_data", {}).get("conclusoes", [])
-        total_story_points = sum(float(item.get("sp", 0)) for item in concl_cards)
-        return {"concluded_cards": concl_cards, "total_story_points": total_story_points}
+        return _serve_view(
+            "analitycs_daily", {"board_id": str(board_id), "sprint_id": str(sprint_id), "day": _today()}, fresh=fresh
+        )
     except Exception as e:
         logger.error(f"Erro na análise diária específica: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+# 🧮 Métricas de retrabalho direto dos agregados incrementais, sem refazer o crawl.
+# 🔄 Janela padrão de 15 dias, em dias inteiros; filtra por sprints (ids separados por vírgula) e detalha por desenvolvedor.
+@router.get("/JIRA_rework_metrics")
+def get_rework_metrics(start_date: datetime = None, end_date: datetime = None, sprint_ids: str = None, by_developer: bool = False):
+    try:
+        end_date = end_date or datetime.now()
+        start_date = start_date or end_date - timedelta(days=15)
+        sprints = [s.strip() for s in sprint_ids.split(",") if s.strip()] if sprint_ids else None
+        metrics = get_rework_aggregates().metrics(start_date.date(), end_date.date(), sprint_ids=sprints, by_developer=by_developer)
+        return {
+            "start_date": start_date.date(),
+            "end_date": end_date.date(),
+            "sprint_ids": sprints,
+            "metrics": metrics
+        }
+    except Exception as e:
+        logger.error(f"Erro ao consultar os agregados de retrabalho: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 # 📋 Lista todos os boards disponíveis no Jira.
 # 🔧 Utilizado pelo frontend (ex: Streamlit) para montar seleções.
 @router.get("/boards")
 def list_boards():
     try:
-        boards = jira_client.get_all_boards()
-        return {"boards": boards}
+        return _list_boards()
     except Exception as e:
         logger.error(f"Erro ao listar boards: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -291,8 +609,37 @@ def list_boards():
 @router.get("/boards/{board_id}/sprints")
 def list_sprints(board_id: str):
     try:
-        sprints = jira_client.get_sprints_by_board(board_id)
-        return {"board_id": board_id, "sprints": sprints}
+        return _list_sprints(board_id)
     except Exception as e:
         logger.error(f"Erro ao listar sprints para o board {board_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+# 📈 Métricas da sessão HTTP com o Jira (pool de conexões, retries e status).
+# 🔧 Útil para acompanhar rate limiting (429) e reaproveitamento de conexões.
+@router.get("/jira/http_stats")
+def jira_http_stats():
+    return get_jira_client().get_http_stats()
+
+# 🧠 Estatísticas do cache de análises do LLM (acertos, falhas, entradas e remoções).
+@router.get("/llm/cache_stats")
+def llm_cache_stats():
+    from src.agents.rework_agent import llm_cache
+    if llm_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **llm_cache.stats()}
+
+# 🗄️ Estatísticas do cache compartilhado de respostas (acertos, falhas, chamadas agrupadas e entradas).
+@router.get("/responses/cache_stats")
+def response_cache_stats():
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "ttl": cache.ttl, **cache.stats()}
+
+# 🗓️ Snapshots pré-calculados das visões de analytics (visão, parâmetros, horário e duração da geração).
+@router.get("/snapshots")
+def list_snapshots():
+    snapshots = get_snapshot_store()
+    if snapshots is None:
+        return {"enabled": False}
+    return {"enabled": True, "interval_seconds": config.SNAPSHOT_INTERVAL_SECONDS, **snapshots.stats()}
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, HTTPException
+
+from src.utils.job_manager import JobManager
+from src.routes.jira_routes import build_all_analytics
+import src.config.config as config
+
+job_manager = JobManager(max_workers=config.JOB_MAX_WORKERS, result_ttl=config.JOB_RESULT_TTL)
+
+router = APIRouter(prefix="/jobs")
+
+
+# 🚀 Dispara a análise de todos os boards em background e devolve o id do job na hora.
+# 🔁 Um job idêntico ainda em andamento é reaproveitado.
+@router.post("/all_analytics", status_code=202)
+async def start_all_analytics_job(num_sprints: int = 2):
+    job = job_manager.submit("all_analytics", {"num_sprints": num_sprints}, build_all_analytics)
+    return {"job_id": job["job_id"], "status": job["status"], "progress": job["progress"]}
+
+
+# ⏳ Consulta o estado de um job: estágio, boards varridos, issues buscadas e o resultado ao final.
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} não encontrado")
+    return job
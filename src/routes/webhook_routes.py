@@ -0,0 +1,59 @@
+from fastapi import APIRouter, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+import json
+import logging
+
+from src.routes.jira_routes import get_event_store, get_rework_aggregates
+from src.utils.jira_webhook import verify_signature, webhook_to_events
+import src.config.config as config
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/webhooks")
+
+
+def _ingest_webhook(payload: dict) -> dict:
+    events, memberships = webhook_to_events(payload, config.JIRA_SPRINT_FIELD)
+    # Com o campo de sprint, o payload traz as sprints atuais da issue: as que ela deixou são
+    # desvinculadas, mesmo sem transição de status (ex.: card movido para outra sprint)
+    exact = bool(memberships)
+    if not len(events) and not exact:
+        return {"accepted": True, "events": 0}
+    issue_key = events.card_keys[0] if len(events) else memberships[0][0]
+    event_store = get_event_store()
+    if not memberships and event_store is not None:
+        # Payload sem o campo de sprint: usa as sprints já conhecidas da issue
+        memberships = [(issue_key, sprint_id) for sprint_id in event_store.sprints_of(issue_key)]
+    # Só as transições novas vão para os agregados: uma reentrega do webhook não conta duas vezes
+    inserted = event_store.append(events, memberships, exact_memberships=exact) if event_store is not None else events
+    get_rework_aggregates().ingest(inserted, memberships, replace=False, exact_memberships=exact)
+    return {"accepted": True, "issue_key": issue_key, "events": len(inserted)}
+
+
+# 🪝 Recebe os webhooks `jira:issue_updated` do Jira e grava as transições de status.
+# 🔄 Mesma extração do crawl; as rotas de analytics passam a ler esses eventos do armazenamento local.
+@router.post("/jira")
+async def jira_webhook(request: Request):
+    body = await request.body()
+    if config.JIRA_WEBHOOK_SECRET and not verify_signature(
+        body, request.headers.get("X-Hub-Signature", ""), config.JIRA_WEBHOOK_SECRET
+    ):
+        raise HTTPException(status_code=401, detail="Assinatura do webhook inválida")
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Payload do webhook não é um JSON válido")
+    try:
+        return await run_in_threadpool(_ingest_webhook, payload)
+    except Exception as e:
+        logger.error(f"Erro ao processar webhook do Jira: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# 🗃️ Estatísticas do armazenamento local de eventos (por origem, issues e sprints sincronizadas).
+@router.get("/jira/stats")
+def jira_webhook_stats():
+    event_store = get_event_store()
+    if event_store is None:
+        return {"enabled": False}
+    return {"enabled": True, "webhooks_serving": config.JIRA_WEBHOOKS_ENABLED, **event_store.stats()}
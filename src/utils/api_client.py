@@ -0,0 +1,58 @@
+import json
+from typing import Iterator
+
+import requests
+
+
+class AnalyticsAPIClient:
+    """
+    Cliente HTTP da API FastAPI para o dashboard. Expõe os mesmos nomes das
+    funções de rota de `src.routes.jira_routes`, então o Streamlit usa um ou
+    outro sem mudar o resto do código; com ele, o crawl e o LLM rodam no
+    serviço (e no cache compartilhado), não no processo do dashboard.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 600):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _get(self, path: str, **params) -> dict:
+        response = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+        if response.status_code != 200:
+            try:
+                detail = response.json().get("detail", response.text)
+            except ValueError:
+                detail = response.text
+            raise Exception(f"Erro {response.status_code} na API ({path}): {detail}")
+        return response.json()
+
+    def list_boards(self) -> dict:
+        return self._get("/boards")
+
+    def list_sprints(self, board_id: str) -> dict:
+        return self._get(f"/boards/{board_id}/sprints")
+
+    def get_analitycs_with_changelogs(self, board_id: str, sprint_id: str, fresh: bool = False) -> dict:
+        return self._get("/JIRA_analitycs_with_changelogs", board_id=board_id, sprint_id=sprint_id, fresh=fresh)
+
+    def get_analitycs_daily(self, board_id: str, sprint_id: str, fresh: bool = False) -> dict:
+        return self._get("/JIRA_analitycs_daily", board_id=board_id, sprint_id=sprint_id, fresh=fresh)
+
+    def get_all_analytics(self, num_sprints: int = 2, fresh: bool = False) -> dict:
+        return self._get("/JIRA_all_analytics", num_sprints=num_sprints, fresh=fresh)
+
+    def get_daily_all_analytics(self, num_sprints: int = 2, fresh: bool = False) -> dict:
+        return self._get("/JIRA_daily_all_analytics", num_sprints=num_sprints, fresh=fresh)
+
+    def iter_all_analytics(self, num_sprints: int, fresh: bool = False) -> Iterator[dict]:
+        """Eventos do streaming NDJSON (`/JIRA_all_analytics/stream`), no mesmo formato de `iter_all_analytics`."""
+        with self.session.get(
+            f"{self.base_url}/JIRA_all_analytics/stream",
+            params={"num_sprints": num_sprints, "fresh": fresh}, stream=True, timeout=self.timeout
+        ) as response:
+            if response.status_code != 200:
+                raise Exception(f"Erro {response.status_code} na API (/JIRA_all_analytics/stream): {response.text}")
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
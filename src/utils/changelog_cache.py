@@ -0,0 +1,47 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+
+class ChangelogCache:
+    """
+    Armazena em disco (SQLite) o changelog de cada issue, junto com o campo
+    `updated` da issue no momento da busca. Enquanto o `updated` não mudar,
+    o histórico é servido localmente sem nova chamada ao Jira.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS changelogs (
+                    issue_key TEXT PRIMARY KEY,
+                    updated   TEXT NOT NULL,
+                    payload   TEXT NOT NULL
+                )
+                """
+            )
+
+    def get(self, issue_key: str, updated: str) -> Optional[dict]:
+        """Retorna o changelog salvo se o `updated` informado for o mesmo do armazenado."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM changelogs WHERE issue_key = ? AND updated = ?",
+                (issue_key, updated)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, issue_key: str, updated: str, payload: dict) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO changelogs (issue_key, updated, payload) VALUES (?, ?, ?)",
+                (issue_key, updated, json.dumps(payload))
+            )
@@ -0,0 +1,161 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+import logging
+import queue
+import threading
+
+from src.utils.jira_archive import ReplayMissError
+from src.utils.rework_search import ReworkEventTable
+from src.config.config import JIRA_MAX_IN_FLIGHT, JIRA_SEARCH_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+def issue_rework_fields(issue: dict) -> Dict[str, Any]:
+    """Extrai da issue os campos usados na extração dos eventos de retrabalho."""
+    fields = issue.get("fields", {})
+    return {
+        "issue_key": issue.get("key"),
+        "dev": fields.get("customfield_10172", "Não definido"),
+        "sp": fields.get("customfield_10106", 0),
+        "assignee": fields.get("assignee") or {},
+    }
+
+
+_END = object()
+
+
+def iter_prefetched(iterable: Iterable, buffer: int = 1) -> Iterator:
+    """
+    Consome `iterable` numa thread auxiliar, mantendo até `buffer` itens à
+    frente do consumidor. Usado para pedir a próxima página de issues enquanto
+    os changelogs da página atual ainda estão sendo buscados. Exceções do
+    iterável são relançadas no consumidor.
+    """
+    items = queue.Queue(maxsize=buffer)
+    stop = threading.Event()
+
+    def _put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _worker():
+        try:
+            for item in iterable:
+                if not _put((item, None)):
+                    return
+        except Exception as ex:
+            _put((_END, ex))
+            return
+        _put((_END, None))
+
+    threading.Thread(target=_worker, daemon=True).start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is _END:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def _fetch_batch(jira_client, batch: List[dict]) -> List[Tuple[dict, dict]]:
+    """
+    Busca o changelog de um lote de issues numa única busca JQL. Se a busca do
+    lote falhar, tenta issue a issue para que uma issue problemática não
+    derrube as demais. Falhas por issue são logadas e ignoradas, exceto no
+    replay: requisição fora do arquivo interrompe o crawl.
+    """
+    updated_by_key = {issue["key"]: issue.get("fields", {}).get("updated") for issue in batch}
+    individual = False
+    try:
+        changelogs = jira_client.get_issue_changelogs(updated_by_key, page_size=len(batch))
+    except ReplayMissError:
+        raise
+    except Exception as ex:
+        logger.warning(f"Falha na busca em lote de changelogs ({len(batch)} issues), buscando individualmente: {ex}")
+        individual = True
+        changelogs = {}
+        for issue_key, updated in updated_by_key.items():
+            try:
+                changelogs[issue_key] = jira_client.get_issue_changelog(issue_key, updated)
+            except ReplayMissError:
+                raise
+            except Exception as ex:
+                logger.error(f"Falha ao buscar changelog para a issue {issue_key}: {ex}", exc_info=True)
+    results = []
+    for issue in batch:
+        changelog_response = changelogs.get(issue["key"])
+        if changelog_response is None:
+            if not individual:
+                logger.error(f"Falha ao buscar changelog para a issue {issue['key']}: não retornada pela busca")
+            continue
+        results.append((issue, changelog_response))
+    return results
+
+
+def _drain(pending: dict) -> Iterator[Tuple[dict, dict]]:
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        pending.pop(future)
+        yield from future.result()
+
+
+def iter_issue_changelogs(
+    jira_client,
+    issues: Iterable[dict],
+    max_in_flight: int = JIRA_MAX_IN_FLIGHT,
+    batch_size: int = JIRA_SEARCH_PAGE_SIZE
+) -> Iterator[Tuple[dict, dict]]:
+    """
+    Busca os changelogs das issues em lotes de `batch_size` (uma busca JQL por
+    lote), com no máximo `max_in_flight` buscas simultâneas, e devolve cada par
+    (issue, changelog) assim que o lote correspondente chega. O iterável de
+    issues é consumido sob demanda. Falhas por issue são logadas e ignoradas.
+    """
+    max_in_flight = max(1, max_in_flight)
+    batch_size = max(1, batch_size)
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        pending = {}
+        batch = []
+        for issue in issues:
+            if not issue.get("key"):
+                continue
+            batch.append(issue)
+            if len(batch) < batch_size:
+                continue
+            if len(pending) >= max_in_flight:
+                yield from _drain(pending)
+            pending[executor.submit(_fetch_batch, jira_client, batch)] = batch
+            batch = []
+        if batch:
+            pending[executor.submit(_fetch_batch, jira_client, batch)] = batch
+        while pending:
+            yield from _drain(pending)
+
+
+def collect_rework_entries(
+    jira_client,
+    issues: Iterable[dict],
+    max_in_flight: int = JIRA_MAX_IN_FLIGHT,
+    batch_size: int = JIRA_SEARCH_PAGE_SIZE,
+    progress=None
+) -> ReworkEventTable:
+    """Busca os changelogs em paralelo e extrai os eventos de retrabalho conforme chegam."""
+    events = ReworkEventTable()
+    for issue, changelog_response in iter_issue_changelogs(jira_client, issues, max_in_flight, batch_size):
+        if progress is not None:
+            progress.increment("issues_fetched")
+        try:
+            events.add_issue(changelog_data=changelog_response, **issue_rework_fields(issue))
+        except Exception as ex:
+            logger.error(f"Falha ao processar changelog da issue {issue.get('key')}: {ex}", exc_info=True)
+    return events
@@ -1,9 +1,29 @@
+import asyncio
 import requests
+import httpx
 import json
-from typing import Any, List, Optional
-from langchain_core.callbacks.manager import CallbackManagerForLLMRun
+import threading
+import time
+import weakref
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from langchain_core.callbacks.manager import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
 from langchain_core.language_models.chat_models import SimpleChatModel
-from langchain_core.messages import BaseMessage, AIMessage, HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage, AIMessage, AIMessageChunk, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.utils.metrics import observe_llm_request
+
+# Status do model serving que valem nova tentativa (rate limit / endpoint escalando)
+RETRY_STATUS_CODES = (429, 503)
+
+# Conexões e limites de concorrência compartilhados entre as instâncias com o mesmo endpoint e configuração
+_pool_lock = threading.Lock()
+_sync_sessions: Dict[tuple, requests.Session] = {}
+_sync_semaphores: Dict[tuple, threading.BoundedSemaphore] = {}
+# httpx.AsyncClient e asyncio.Semaphore pertencem a um event loop; um conjunto por loop
+_async_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, Any]]" = weakref.WeakKeyDictionary()
 
 def _message_to_dict(message: BaseMessage) -> dict:
     """Converte uma mensagem LangChain para o formato de dicionário da API."""
@@ -17,45 +37,275 @@ def _message_to_dict(message: BaseMessage) -> dict:
         raise ValueError(f"Tipo de mensagem desconhecido: {message}")
     return {"role": role, "content": message.content}
 
+def _parse_stream_line(line: str) -> Optional[str]:
+    """Extrai o trecho de texto de uma linha SSE (`data: {...}`) do modo `stream` compatível com OpenAI."""
+    if not line or not line.startswith("data:"):
+        return None
+    data = line[len("data:"):].strip()
+    if data == "[DONE]":
+        return None
+    chunk = json.loads(data)
+    choices = chunk.get("choices") or [{}]
+    return (choices[0].get("delta") or {}).get("content")
+
 class ChatDatabricks(SimpleChatModel):
     """
     Cliente de Chat customizado para chamar um endpoint de modelo no Databricks
     que seja compatível com a API da OpenAI (como o Llama 3).
+
+    As conexões (sync e async) são reaproveitadas por endpoint, cada chamada tem
+    timeout de conexão/leitura, no máximo `max_concurrency` inferências ficam em
+    andamento por endpoint e respostas 429/503 são repetidas com backoff.
+    Instâncias com limites ou retries diferentes usam conexões e semáforos próprios.
     """
     endpoint_url: str
     token: str
     temperature: float = 0.7
     max_tokens: int = 10000 
+    connect_timeout: float = 10.0
+    read_timeout: float = 300.0
+    max_concurrency: int = 4
+    max_retries: int = 3
+    backoff_factor: float = 1.0
+    pool_size: int = 10
 
-    def _call(
-        self,
-        messages: List[BaseMessage],
-        stop: Optional[List[str]] = None,
-        run_manager: Optional[CallbackManagerForLLMRun] = None,
-        **kwargs: Any,
-    ) -> str:
-        
-        headers = {
+    def _headers(self) -> dict:
+        return {
             'Authorization': f'Bearer {self.token}',
             'Content-Type': 'application/json'
         }
 
-        message_dicts = [_message_to_dict(m) for m in messages]
-
+    def _payload(self, messages: List[BaseMessage], stream: bool = False) -> dict:
         payload = {
-            "messages": message_dicts,
+            "messages": [_message_to_dict(m) for m in messages],
             "temperature": self.temperature,
             "max_tokens": self.max_tokens
         }
+        if stream:
+            payload["stream"] = True
+        return payload
 
-        response = requests.post(self.endpoint_url, headers=headers, data=json.dumps(payload))
+    def _pool_key(self) -> tuple:
+        # Inclui tudo o que vai para a sessão, o semáforo ou o cliente async, para que a
+        # configuração da primeira instância não valha silenciosamente para as demais
+        return (
+            self.endpoint_url, self.max_concurrency, self.max_retries, self.backoff_factor,
+            self.pool_size, self.connect_timeout, self.read_timeout
+        )
+
+    def _session(self) -> requests.Session:
+        with _pool_lock:
+            session = _sync_sessions.get(self._pool_key())
+            if session is None:
+                # A inferência não é idempotente: só repete falha de conexão e 429/503 (como `_asend`),
+                # nunca timeout de leitura, que duplicaria a cobrança e prenderia a vaga do semáforo
+                retry = Retry(
+                    total=self.max_retries,
+                    connect=self.max_retries,
+                    read=0,
+                    other=0,
+                    status=self.max_retries,
+                    backoff_factor=self.backoff_factor,
+                    status_forcelist=RETRY_STATUS_CODES,
+                    allowed_methods=frozenset({"POST"}),
+                    respect_retry_after_header=True,
+                    raise_on_status=False
+                )
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _sync_sessions[self._pool_key()] = session
+            return session
+
+    def _semaphore(self) -> threading.BoundedSemaphore:
+        with _pool_lock:
+            semaphore = _sync_semaphores.get(self._pool_key())
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_concurrency)
+                _sync_semaphores[self._pool_key()] = semaphore
+            return semaphore
+
+    def _async_pool(self) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        pools = _async_pools.setdefault(loop, {})
+        pool = pools.get(self._pool_key())
+        if pool is None:
+            pool = {
+                "client": httpx.AsyncClient(
+                    timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                    limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+                ),
+                "semaphore": asyncio.Semaphore(self.max_concurrency),
+            }
+            pools[self._pool_key()] = pool
+        return pool
+
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> float:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+        return self.backoff_factor * (2 ** attempt)
+
+    async def _asend(self, client: httpx.AsyncClient, payload: dict, stream: bool = False) -> httpx.Response:
+        """POST assíncrono com nova tentativa em 429/503 (respeitando Retry-After)."""
+        attempt = 0
+        while True:
+            request = client.build_request("POST", self.endpoint_url, headers=self._headers(), content=json.dumps(payload))
+            response = await client.send(request, stream=stream)
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                delay = self._retry_delay(response, attempt)
+                await response.aclose()
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            if response.is_error:
+                await response.aread()
+                await response.aclose()
+                response.raise_for_status()
+            return response
+
+    def _call(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        
+        headers = self._headers()
+        payload = self._payload(messages)
+
+        start = time.perf_counter()
+        with self._semaphore():
+            try:
+                response = self._session().post(
+                    self.endpoint_url,
+                    headers=headers,
+                    data=json.dumps(payload),
+                    timeout=(self.connect_timeout, self.read_timeout)
+                )
+            except requests.RequestException:
+                observe_llm_request("call", "erro", time.perf_counter() - start)
+                raise
         
         # Lança um erro se a resposta não for bem-sucedida (ex: 401, 404, 500)
+        if not response.ok:
+            observe_llm_request("call", response.status_code, time.perf_counter() - start)
         response.raise_for_status() 
 
         response_json = response.json()
+        observe_llm_request("call", response.status_code, time.perf_counter() - start, response_json.get("usage"))
         
         # A estrutura de resposta do Databricks para modelos foundation segue este padrão
         content = response_json["choices"][0]["message"]["content"]
         
-        return content
\ No newline at end of file
+        return content
+
+    async def _acall(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        pool = self._async_pool()
+        start = time.perf_counter()
+        async with pool["semaphore"]:
+            try:
+                response = await self._asend(pool["client"], self._payload(messages))
+            except httpx.HTTPStatusError as e:
+                observe_llm_request("acall", e.response.status_code, time.perf_counter() - start)
+                raise
+            except httpx.HTTPError:
+                observe_llm_request("acall", "erro", time.perf_counter() - start)
+                raise
+        response_json = response.json()
+        observe_llm_request("acall", response.status_code, time.perf_counter() - start, response_json.get("usage"))
+        return response_json["choices"][0]["message"]["content"]
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        output_str = await self._acall(messages, stop=stop, run_manager=run_manager, **kwargs)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=output_str))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        # Modo `stream: true` do endpoint: os tokens chegam como eventos SSE.
+        # Fechar o gerador (ex.: cliente desconectou) fecha a conexão e interrompe a geração.
+        start = time.perf_counter()
+        with self._semaphore():
+            try:
+                response = self._session().post(
+                    self.endpoint_url,
+                    headers=self._headers(),
+                    data=json.dumps(self._payload(messages, stream=True)),
+                    timeout=(self.connect_timeout, self.read_timeout),
+                    stream=True
+                )
+            except requests.RequestException:
+                observe_llm_request("stream", "erro", time.perf_counter() - start)
+                raise
+            chunks = 0
+            try:
+                response.raise_for_status()
+                for line in response.iter_lines(decode_unicode=True):
+                    token = _parse_stream_line(line)
+                    if not token:
+                        continue
+                    chunks += 1
+                    if run_manager:
+                        run_manager.on_llm_new_token(token)
+                    yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+            finally:
+                response.close()
+                observe_llm_request("stream", response.status_code, time.perf_counter() - start, completion_chunks=chunks)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        pool = self._async_pool()
+        start = time.perf_counter()
+        async with pool["semaphore"]:
+            try:
+                response = await self._asend(pool["client"], self._payload(messages, stream=True), stream=True)
+            except httpx.HTTPStatusError as e:
+                observe_llm_request("astream", e.response.status_code, time.perf_counter() - start)
+                raise
+            except httpx.HTTPError:
+                observe_llm_request("astream", "erro", time.perf_counter() - start)
+                raise
+            chunks = 0
+            try:
+                async for line in response.aiter_lines():
+                    token = _parse_stream_line(line)
+                    if not token:
+                        continue
+                    chunks += 1
+                    if run_manager:
+                        await run_manager.on_llm_new_token(token)
+                    yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+            finally:
+                await response.aclose()
+                observe_llm_request("astream", response.status_code, time.perf_counter() - start, completion_chunks=chunks)
+
+    @property
+    def _llm_type(self) -> str:
+        return "chat-databricks"
@@ -0,0 +1,184 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.utils.rework_search import ReworkEventTable
+
+_COLUMNS = ("card_key", "responsavel", "desenvolvedor", "status_novo", "data_mudanca", "sp")
+
+
+def _sp_value(sp):
+    try:
+        return float(sp) if sp is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class ReworkEventStore:
+    """
+    Armazena em disco (SQLite) os eventos de retrabalho vindos do crawl e dos
+    webhooks do Jira, junto com as sprints de cada issue e o momento em que
+    cada sprint foi sincronizada por completo. Um crawl substitui os eventos
+    das issues buscadas; um webhook só acrescenta transições novas.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS events (
+                    card_key      TEXT NOT NULL,
+                    responsavel   TEXT,
+                    desenvolvedor TEXT,
+                    status_novo   TEXT NOT NULL,
+                    data_mudanca  TEXT NOT NULL,
+                    sp            REAL,
+                    source        TEXT NOT NULL,
+                    PRIMARY KEY (card_key, status_novo, data_mudanca)
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS issue_sprints (
+                    issue_key TEXT NOT NULL,
+                    sprint_id TEXT NOT NULL,
+                    PRIMARY KEY (issue_key, sprint_id)
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_issue_sprints_sprint ON issue_sprints (sprint_id)")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sprint_sync (
+                    sprint_id TEXT PRIMARY KEY,
+                    synced_at REAL NOT NULL
+                )
+                """
+            )
+
+    @staticmethod
+    def _rows(events: ReworkEventTable, source: str) -> List[tuple]:
+        return [
+            (card_key, responsavel, desenvolvedor, status, data, _sp_value(sp), source)
+            for card_key, responsavel, desenvolvedor, status, data, sp in zip(
+                events.card_keys, events.responsaveis, events.desenvolvedores,
+                events.statuses, events.datas, events.sps
+            )
+            if data
+        ]
+
+    def replace_issues(
+        self, events: ReworkEventTable, memberships: Iterable[Tuple[str, object]], crawled_sprints: Iterable = ()
+    ) -> None:
+        """
+        Grava o resultado de um crawl: as issues listadas em `memberships` têm
+        seus eventos trocados pelos novos. `crawled_sprints` são as sprints
+        percorridas por completo; issues gravadas nelas que não vieram no crawl
+        saíram da sprint e perdem o vínculo.
+        """
+        memberships = [(key, str(sprint_id)) for key, sprint_id in memberships if key]
+        issue_keys = [(key,) for key in {key for key, _ in memberships}]
+        current = set(memberships)
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM events WHERE card_key = ?", issue_keys)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)", self._rows(events, "crawl")
+            )
+            for sprint_id in {str(s) for s in crawled_sprints}:
+                stored = self._conn.execute("SELECT issue_key FROM issue_sprints WHERE sprint_id = ?", (sprint_id,)).fetchall()
+                self._conn.executemany(
+                    "DELETE FROM issue_sprints WHERE issue_key = ? AND sprint_id = ?",
+                    [(key, sprint_id) for (key,) in stored if (key, sprint_id) not in current]
+                )
+            self._conn.executemany("INSERT OR IGNORE INTO issue_sprints VALUES (?, ?)", memberships)
+
+    def append(
+        self, events: ReworkEventTable, memberships: Iterable[Tuple[str, object]] = (), exact_memberships: bool = False
+    ) -> ReworkEventTable:
+        """
+        Acrescenta eventos (ex.: de webhook), ignorando transições já gravadas;
+        retorna só os que entraram. Com `exact_memberships`, `memberships` traz
+        todas as sprints atuais das issues e os vínculos com as demais são removidos.
+        """
+        memberships = [(key, str(sprint_id)) for key, sprint_id in memberships if key]
+        inserted = ReworkEventTable()
+        with self._lock, self._conn:
+            if exact_memberships:
+                for issue_key in {key for key, _ in memberships}:
+                    keep = [sprint_id for key, sprint_id in memberships if key == issue_key]
+                    self._conn.execute(
+                        f"DELETE FROM issue_sprints WHERE issue_key = ? AND sprint_id NOT IN ({','.join('?' * len(keep))})",
+                        (issue_key, *keep)
+                    )
+            for row in self._rows(events, "webhook"):
+                if self._conn.execute("INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)", row).rowcount:
+                    for column, value in zip(ReworkEventTable.__slots__, row):
+                        getattr(inserted, column).append(value)
+            self._conn.executemany("INSERT OR IGNORE INTO issue_sprints VALUES (?, ?)", memberships)
+        return inserted
+
+    def sprints_of(self, issue_key: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sprint_id FROM issue_sprints WHERE issue_key = ?", (issue_key,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def mark_synced(self, sprint_id, synced_at: Optional[float] = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sprint_sync VALUES (?, ?)",
+                (str(sprint_id), synced_at if synced_at is not None else time.time())
+            )
+
+    def synced_sprints(self, sprint_ids: Iterable, max_age: float) -> Dict[str, float]:
+        """Sprints (entre as informadas) sincronizadas há no máximo `max_age` segundos."""
+        sprint_ids = [str(s) for s in sprint_ids]
+        if not sprint_ids:
+            return {}
+        placeholders = ",".join("?" * len(sprint_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT sprint_id, synced_at FROM sprint_sync WHERE sprint_id IN ({placeholders}) AND synced_at >= ?",
+                (*sprint_ids, time.time() - max_age)
+            ).fetchall()
+        return dict(rows)
+
+    def load(self, sprint_ids: Optional[Iterable] = None) -> Tuple[ReworkEventTable, List[Tuple[str, str]]]:
+        """Eventos das issues das sprints informadas (ou todos), com os pares (issue, sprint)."""
+        query = f"SELECT {', '.join(_COLUMNS)} FROM events"
+        params: tuple = ()
+        if sprint_ids is not None:
+            sprint_ids = [str(s) for s in sprint_ids]
+            if not sprint_ids:
+                return ReworkEventTable(), []
+            placeholders = ",".join("?" * len(sprint_ids))
+            query += f" WHERE card_key IN (SELECT issue_key FROM issue_sprints WHERE sprint_id IN ({placeholders}))"
+            params = tuple(sprint_ids)
+            membership_query = f"SELECT issue_key, sprint_id FROM issue_sprints WHERE sprint_id IN ({placeholders})"
+        else:
+            membership_query = "SELECT issue_key, sprint_id FROM issue_sprints"
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY rowid", params).fetchall()
+            memberships = self._conn.execute(membership_query, params).fetchall()
+        events = ReworkEventTable()
+        if rows:
+            (events.card_keys, events.responsaveis, events.desenvolvedores,
+             events.statuses, events.datas, events.sps) = (list(column) for column in zip(*rows))
+        return events, memberships
+
+    def stats(self) -> dict:
+        with self._lock:
+            by_source = dict(self._conn.execute("SELECT source, COUNT(*) FROM events GROUP BY source").fetchall())
+            issues = self._conn.execute("SELECT COUNT(DISTINCT issue_key) FROM issue_sprints").fetchone()[0]
+            sprints = self._conn.execute("SELECT COUNT(*) FROM sprint_sync").fetchone()[0]
+        return {"events": by_source, "issues": issues, "synced_sprints": sprints}
@@ -0,0 +1,105 @@
+import gzip
+import json
+import os
+import threading
+from io import BytesIO
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.response import HTTPResponse
+
+# Cabeçalhos que deixam de valer depois que o corpo é gravado já descomprimido
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+
+def archive_key(method: str, url: str) -> str:
+    """Chave de uma requisição: método, caminho e parâmetros ordenados (sem host, para valer entre instâncias)."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{method.upper()} {parts.path}" + (f"?{query}" if query else "")
+
+
+class JiraArchive:
+    """
+    Respostas do Jira gravadas em disco num JSONL comprimido (gzip), uma por
+    linha: chave da requisição, status, cabeçalhos e corpo. Cada gravação é um
+    membro gzip acrescentado ao arquivo, então um processo interrompido não
+    perde o que já foi gravado. Na leitura, a última resposta de cada chave vale.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def append(self, key: str, status: int, headers: dict, body: bytes) -> None:
+        record = {
+            "key": key,
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS},
+            "body": body.decode("utf-8", errors="replace"),
+        }
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock, gzip.open(self.path, "ab") as f:
+            f.write(line)
+
+    def load(self) -> Dict[str, dict]:
+        if not os.path.exists(self.path):
+            raise Exception(f"Erro ao abrir o arquivo de respostas do Jira: {self.path} não existe")
+        records = {}
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    records[record["key"]] = record
+        return records
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Adapter HTTP normal (pool + retry) que grava no arquivo cada resposta final recebida."""
+
+    def __init__(self, archive: JiraArchive, **kwargs):
+        self.archive = archive
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        self.archive.append(archive_key(request.method, request.url), response.status_code, dict(response.headers), response.content)
+        return response
+
+
+class ReplayMissError(Exception):
+    """Requisição feita em modo replay que não está no arquivo de respostas."""
+
+
+class ReplayAdapter(HTTPAdapter):
+    """
+    Serve as respostas gravadas, sem acesso à rede. Requisição que não está no
+    arquivo levanta `ReplayMissError`: o replay só vale se repetir exatamente a
+    gravação, e um erro silencioso esconderia dados faltando.
+    """
+
+    def __init__(self, archive: JiraArchive, **kwargs):
+        super().__init__(**kwargs)
+        self.records = archive.load()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def send(self, request, **kwargs):
+        key = archive_key(request.method, request.url)
+        record: Optional[dict] = self.records.get(key)
+        with self._lock:
+            self.stats["hits" if record is not None else "misses"] += 1
+        if record is None:
+            raise ReplayMissError(f"Erro no replay do Jira: requisição não gravada no arquivo: {key}")
+        raw = HTTPResponse(
+            body=BytesIO(record["body"].encode("utf-8")),
+            headers=record["headers"],
+            status=record["status"],
+            preload_content=False,
+            decode_content=False,
+        )
+        return self.build_response(request, raw)
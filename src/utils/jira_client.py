@@ -1,42 +1,241 @@
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.utils.jira_archive import JiraArchive, RecordingAdapter, ReplayAdapter
+from src.utils.metrics import observe_jira_request, timed_method
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
 
 class JiraClient:
-    def __init__(self, base_url, email, api_token):
+    def __init__(
+        self,
+        base_url,
+        email,
+        api_token,
+        changelog_cache=None,
+        pool_size=10,
+        max_retries=5,
+        backoff_factor=0.5,
+        timeout=(10, 60),
+        mode="live",
+        archive_path=None
+    ):
+        # mode: "live" (só rede), "record" (rede + grava as respostas em `archive_path`)
+        # ou "replay" (serve as respostas gravadas, sem rede)
+        if mode not in ("live", "record", "replay"):
+            raise Exception(f"Erro na configuração do JiraClient: modo desconhecido '{mode}'")
+        if mode != "live" and not archive_path:
+            raise Exception(f"Erro na configuração do JiraClient: o modo '{mode}' exige um arquivo de respostas")
+        if mode == "replay" and not base_url:
+            base_url = "http://jira.replay"
+        self.mode = mode
         self.base_url = base_url
         self.auth = (email, api_token)
+        # Gravação e replay precisam passar pela rede/arquivo em toda chamada: com o cache de
+        # changelogs, issues já cacheadas não seriam gravadas e a JQL em lote mudaria com o cache
+        self.changelog_cache = changelog_cache if mode == "live" else None
+        self.timeout = timeout
 
-    def get_single_board(self, board_id, sprint_id):
-        url = f"{self.base_url}/rest/agile/1.0/board/{board_id}/sprint/{sprint_id}/issue"
-        params = {
-            "jql": "status NOT IN (CANCELADO)",
-            "fields": "customfield_10106,customfield_10172,assignee,status,created"
-        }
-        headers = {"Accept": "application/json"}
-        response = requests.get(url, headers=headers, params=params, auth=self.auth)
-        if response.status_code == 200:
-            return response.json()
+        # Sessão compartilhada: conexões keep-alive reaproveitadas entre chamadas e threads.
+        # Retry com backoff exponencial em 429/5xx, respeitando o header Retry-After.
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset({"GET", "POST"}),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter_kwargs = {"pool_connections": pool_size, "pool_maxsize": pool_size, "max_retries": retry}
+        if mode == "record":
+            self._adapter = RecordingAdapter(JiraArchive(archive_path), **adapter_kwargs)
+        elif mode == "replay":
+            self._adapter = ReplayAdapter(JiraArchive(archive_path), **adapter_kwargs)
         else:
-            raise Exception(f"Erro ao buscar o board/sprint: {response.status_code} - {response.text}")
+            self._adapter = HTTPAdapter(**adapter_kwargs)
+        self.session = requests.Session()
+        self.session.auth = self.auth
+        self.session.headers.update({"Accept": "application/json", "Accept-Encoding": "gzip, deflate"})
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "status_codes": {}}
+
+    def _get(self, url, params=None):
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, params=params, timeout=self.timeout)
+        except requests.RequestException:
+            observe_jira_request(url, "erro", time.perf_counter() - start)
+            raise
+        observe_jira_request(url, response.status_code, time.perf_counter() - start)
+        retries = response.raw.retries
+        with self._stats_lock:
+            self._stats["requests"] += 1
+            self._stats["retries"] += len(retries.history) if retries is not None else 0
+            codes = self._stats["status_codes"]
+            codes[response.status_code] = codes.get(response.status_code, 0) + 1
+        return response
+
+    def get_http_stats(self) -> dict:
+        """Métricas do pool de conexões e das tentativas de retry."""
+        pools = []
+        poolmanager = self._adapter.poolmanager
+        for key in list(poolmanager.pools.keys()):
+            pool = poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            pools.append({
+                "host": pool.host,
+                "connections_opened": pool.num_connections,
+                "requests": pool.num_requests,
+                "idle_connections": pool.pool.qsize() if pool.pool is not None else 0,
+                "max_size": self._adapter._pool_maxsize
+            })
+        with self._stats_lock:
+            stats = {
+                "requests": self._stats["requests"],
+                "retries": self._stats["retries"],
+                "status_codes": dict(self._stats["status_codes"])
+            }
+        stats["pools"] = pools
+        stats["mode"] = self.mode
+        if self.mode == "replay":
+            stats["replay"] = dict(self._adapter.stats)
+        return stats
+
+    @timed_method("get_single_board")
+    def get_single_board(self, board_id, sprint_id, page_size=100):
+        """
+        Gera, sob demanda, as páginas de issues de um board/sprint. Cada página
+        só é pedida quando a anterior foi consumida.
+        """
+        url = f"{self.base_url}/rest/agile/1.0/board/{board_id}/sprint/{sprint_id}/issue"
+        start_at = 0
+        while True:
+            params = {
+                "jql": "status NOT IN (CANCELADO)",
+                "fields": "customfield_10106,customfield_10172,assignee,status,created,updated",
+                "startAt": start_at,
+                "maxResults": page_size
+            }
+            response = self._get(url, params=params)
+            if response.status_code != 200:
+                raise Exception(f"Erro ao buscar o board/sprint: {response.status_code} - {response.text}")
+            data = response.json()
+            issues = data.get("issues", [])
+            yield issues
+            start_at += len(issues)
+            if data.get("isLast") or not issues or start_at >= data.get("total", 0):
+                break
 
-    def get_issue_changelog(self, issue_id) -> dict:
+    @timed_method("get_issue_changelog")
+    def get_issue_changelog(self, issue_id, updated=None) -> dict:
+        # Se o `updated` da issue não mudou desde a última busca, o histórico salvo ainda vale
+        if self.changelog_cache is not None and updated:
+            cached = self.changelog_cache.get(issue_id, updated)
+            if cached is not None:
+                return cached
         url = f"{self.base_url}/rest/api/2/issue/{issue_id}"
-        params = {"expand": "changelog"}
-        headers = {"Accept": "application/json"}
-        response = requests.get(url, headers=headers, params=params, auth=self.auth)
+        params = {"expand": "changelog", "fields": "updated"}
+        response = self._get(url, params=params)
         if response.status_code == 200:
-            return response.json()
+            data = response.json()
+            if self.changelog_cache is not None:
+                fetched_updated = data.get("fields", {}).get("updated") or updated
+                if fetched_updated:
+                    self.changelog_cache.put(issue_id, fetched_updated, data)
+            return data
         else:
             raise Exception(f"Erro ao buscar changelog: {response.status_code} - {response.text}")
 
+    @timed_method("search_issues")
+    def search_issues(self, jql, fields, expand=None, page_size=100):
+        """Percorre, página a página, o resultado de uma busca JQL em /rest/api/2/search."""
+        url = f"{self.base_url}/rest/api/2/search"
+        start_at = 0
+        while True:
+            params = {"jql": jql, "fields": fields, "startAt": start_at, "maxResults": page_size}
+            if expand:
+                params["expand"] = expand
+            response = self._get(url, params=params)
+            if response.status_code != 200:
+                raise Exception(f"Erro na busca JQL: {response.status_code} - {response.text}")
+            data = response.json()
+            issues = data.get("issues", [])
+            yield from issues
+            start_at += len(issues)
+            if not issues or start_at >= data.get("total", 0):
+                break
+
+    @timed_method("complete_changelog")
+    def _complete_changelog(self, issue):
+        """Busca o restante do histórico quando o changelog embutido na busca veio truncado."""
+        changelog = issue.get("changelog", {})
+        histories = changelog.get("histories", [])
+        if changelog.get("total", len(histories)) <= len(histories):
+            return issue
+        url = f"{self.base_url}/rest/api/2/issue/{issue['key']}/changelog"
+        histories = []
+        start_at = 0
+        while True:
+            params = {"startAt": start_at, "maxResults": 100}
+            response = self._get(url, params=params)
+            if response.status_code != 200:
+                raise Exception(f"Erro ao buscar changelog: {response.status_code} - {response.text}")
+            data = response.json()
+            values = data.get("values", [])
+            histories.extend(values)
+            start_at += len(values)
+            if data.get("isLast", True) or not values:
+                break
+        issue["changelog"] = {"startAt": 0, "maxResults": len(histories), "total": len(histories), "histories": histories}
+        return issue
+
+    @timed_method("get_issue_changelogs")
+    def get_issue_changelogs(self, updated_by_key, page_size=50) -> dict:
+        """
+        Busca o changelog de várias issues de uma vez (JQL `key in (...)` com
+        expand=changelog), em vez de uma chamada por issue. Recebe um dicionário
+        issue_key -> `updated` e devolve issue_key -> payload no mesmo formato de
+        `get_issue_changelog`. Issues com histórico inalterado vêm do cache.
+        """
+        changelogs = {}
+        missing = []
+        for issue_key, updated in updated_by_key.items():
+            cached = None
+            if self.changelog_cache is not None and updated:
+                cached = self.changelog_cache.get(issue_key, updated)
+            if cached is not None:
+                changelogs[issue_key] = cached
+            else:
+                missing.append(issue_key)
+        for i in range(0, len(missing), page_size):
+            keys = missing[i:i + page_size]
+            jql = f"key in ({','.join(keys)})"
+            for issue in self.search_issues(jql, fields="updated", expand="changelog", page_size=page_size):
+                issue = self._complete_changelog(issue)
+                issue_key = issue.get("key")
+                changelogs[issue_key] = issue
+                fetched_updated = issue.get("fields", {}).get("updated") or updated_by_key.get(issue_key)
+                if self.changelog_cache is not None and fetched_updated:
+                    self.changelog_cache.put(issue_key, fetched_updated, issue)
+        return changelogs
+
+    @timed_method("get_all_boards")
     def get_all_boards(self):
         url = f"{self.base_url}/rest/agile/1.0/board"
-        headers = {"Accept": "application/json"}
         boards = []
         start_at = 0
         max_results = 50
         while True:
             params = {"startAt": start_at, "maxResults": max_results}
-            response = requests.get(url, headers=headers, params=params, auth=self.auth)
+            response = self._get(url, params=params)
             if response.status_code != 200:
                 raise Exception(f"Erro ao buscar boards: {response.status_code} - {response.text}")
             data = response.json()
@@ -46,15 +245,15 @@ class JiraClient:
             start_at += max_results
         return boards
 
+    @timed_method("get_sprints_by_board")
     def get_sprints_by_board(self, board_id):
         url = f"{self.base_url}/rest/agile/1.0/board/{board_id}/sprint"
-        headers = {"Accept": "application/json"}
         sprints = []
         start_at = 0
         max_results = 50
         while True:
             params = {"startAt": start_at, "maxResults": max_results}
-            response = requests.get(url, headers=headers, params=params, auth=self.auth)
+            response = self._get(url, params=params)
             if response.status_code != 200:
                 raise Exception(f"Erro ao buscar sprints para o board {board_id}: {response.status_code} - {response.text}")
             data = response.json()
@@ -63,3 +262,64 @@ class JiraClient:
                 break
             start_at += max_results
         return sprints
+
+    def _get_sprint_page(self, board_id, start_at, max_results, state=None):
+        url = f"{self.base_url}/rest/agile/1.0/board/{board_id}/sprint"
+        params = {"startAt": start_at, "maxResults": max_results}
+        if state:
+            params["state"] = state
+        response = self._get(url, params=params)
+        if response.status_code != 200:
+            raise Exception(f"Erro ao buscar sprints para o board {board_id}: {response.status_code} - {response.text}")
+        return response.json()
+
+    @timed_method("get_recent_sprints")
+    def get_recent_sprints(self, board_id, limit, states=("active", "closed"), page_size=50):
+        """
+        Retorna ao menos `limit` sprints mais recentes do board (quando existirem),
+        filtrando por estado no servidor. O Jira lista as sprints da mais antiga
+        para a mais nova, então localiza a última página e volta página a página,
+        parando assim que juntar sprints suficientes.
+        """
+        state = ",".join(states) if states else None
+        first = self._get_sprint_page(board_id, 0, page_size, state)
+        values = first.get("values", [])
+        if first.get("isLast", True):
+            return values
+
+        # Localiza a última página: usa `total` quando vier, senão dobra o salto até passar do fim
+        if first.get("total") is not None:
+            last_start = max(0, (first["total"] - 1) // page_size * page_size)
+            last_page = self._get_sprint_page(board_id, last_start, page_size, state)
+        else:
+            low, high = 0, page_size
+            last_page = None
+            while True:
+                page = self._get_sprint_page(board_id, high, page_size, state)
+                if page.get("values") and page.get("isLast", True):
+                    last_start, last_page = high, page
+                    break
+                if not page.get("values"):
+                    break
+                low, high = high, high * 2
+            if last_page is None:
+                # Passou do fim: busca binária (em múltiplos de page_size) pela última página não vazia
+                while high - low > page_size:
+                    mid = (low + high) // 2 // page_size * page_size
+                    page = self._get_sprint_page(board_id, mid, page_size, state)
+                    if page.get("values"):
+                        low = mid
+                        if page.get("isLast", True):
+                            break
+                    else:
+                        high = mid
+                last_start = low
+                last_page = first if low == 0 else self._get_sprint_page(board_id, low, page_size, state)
+
+        sprints = list(last_page.get("values", []))
+        start_at = last_start
+        while len(sprints) < limit and start_at > 0:
+            start_at = max(0, start_at - page_size)
+            page = first if start_at == 0 else self._get_sprint_page(board_id, start_at, page_size, state)
+            sprints = page.get("values", []) + sprints
+        return sprints
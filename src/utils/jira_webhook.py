@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import List, Tuple
+import hashlib
+import hmac
+
+from src.utils.changelog_fetcher import issue_rework_fields
+from src.utils.rework_search import ReworkEventTable
+
+ISSUE_UPDATED = "jira:issue_updated"
+
+
+def verify_signature(body: bytes, signature: str, secret: str) -> bool:
+    """Confere o cabeçalho `X-Hub-Signature` (sha256=<hex>) enviado pelo Jira."""
+    if not signature:
+        return False
+    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature.strip())
+
+
+def _event_timestamp(payload: dict) -> str:
+    """
+    Data da transição no formato do changelog. O `updated` da issue coincide com
+    o `created` do histórico gerado pela mudança, o que deixa o evento igual ao
+    que um crawl traria; sem ele, usa o `timestamp` (ms) do webhook.
+    """
+    updated = payload.get("issue", {}).get("fields", {}).get("updated")
+    if updated:
+        return updated
+    timestamp = payload.get("timestamp")
+    moment = datetime.fromtimestamp(timestamp / 1000).astimezone() if timestamp else datetime.now().astimezone()
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}" + moment.strftime("%z")
+
+
+def _issue_sprints(issue: dict, sprint_field: str) -> List[str]:
+    sprints = issue.get("fields", {}).get(sprint_field) or []
+    if isinstance(sprints, dict):
+        sprints = [sprints]
+    return [str(s.get("id")) for s in sprints if isinstance(s, dict) and s.get("id") is not None]
+
+
+def webhook_to_events(payload: dict, sprint_field: str) -> Tuple[ReworkEventTable, List[Tuple[str, str]]]:
+    """
+    Converte um payload `jira:issue_updated` em eventos de retrabalho, montando
+    um histórico com os itens do `changelog` do webhook e passando pela mesma
+    regra do crawl (`ReworkEventTable.add_issue`). Retorna também os pares
+    (issue, sprint) presentes no payload.
+    """
+    events = ReworkEventTable()
+    issue = payload.get("issue") or {}
+    if payload.get("webhookEvent") != ISSUE_UPDATED or not issue.get("key"):
+        return events, []
+    fields = issue_rework_fields(issue)
+    items = (payload.get("changelog") or {}).get("items") or []
+    history = {"created": _event_timestamp(payload), "items": items}
+    events.add_issue(
+        fields["issue_key"], fields["dev"], fields["sp"],
+        {"changelog": {"histories": [history]}}, fields["assignee"]
+    )
+    memberships = [(fields["issue_key"], sprint_id) for sprint_id in _issue_sprints(issue, sprint_field)]
+    return events, memberships
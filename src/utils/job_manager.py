@@ -0,0 +1,114 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import json
+import logging
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class JobProgress:
+    """Progresso de um job, atualizado pela thread de trabalho e lido pelas rotas."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {"stage": "na fila", "boards_scanned": 0, "issues_fetched": 0}
+
+    def update(self, **fields):
+        with self._lock:
+            self._data.update(fields)
+
+    def increment(self, field: str, amount: int = 1):
+        with self._lock:
+            self._data[field] = self._data.get(field, 0) + amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._data)
+
+
+class JobManager:
+    """
+    Executa análises demoradas num pool de threads em background. Jobs
+    idênticos (mesmo tipo e parâmetros) ainda em andamento são reaproveitados
+    em vez de disparar um novo crawl. Jobs finalizados ficam disponíveis por
+    `result_ttl` segundos.
+    """
+
+    def __init__(self, max_workers: int = 2, result_ttl: float = 3600):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analytics-job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._in_flight = {}
+        self.result_ttl = result_ttl
+
+    def _purge(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["finished_at"] is not None and now - job["finished_at"] > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, kind: str, params: Dict[str, Any], fn: Callable[..., Any]) -> Dict[str, Any]:
+        """Agenda `fn(**params, progress=...)` e retorna o estado do job (novo ou já em andamento)."""
+        key = f"{kind}:{json.dumps(params, sort_keys=True)}"
+        with self._lock:
+            self._purge()
+            job_id = self._in_flight.get(key)
+            if job_id is not None:
+                return self._snapshot(self._jobs[job_id])
+            job_id = uuid.uuid4().hex
+            job = {
+                "job_id": job_id,
+                "kind": kind,
+                "params": params,
+                "status": "pending",
+                "progress": JobProgress(),
+                "result": None,
+                "error": None,
+                "created_at": time.time(),
+                "finished_at": None,
+            }
+            self._jobs[job_id] = job
+            self._in_flight[key] = job_id
+        self._executor.submit(self._run, key, job, fn)
+        return self._snapshot(job)
+
+    def _run(self, key: str, job: Dict[str, Any], fn: Callable[..., Any]):
+        job["status"] = "running"
+        try:
+            job["result"] = fn(**job["params"], progress=job["progress"])
+            job["status"] = "done"
+            job["progress"].update(stage="concluído")
+        except Exception as e:
+            logger.error(f"Job {job['job_id']} ({job['kind']}) falhou: {e}", exc_info=True)
+            job["error"] = str(e)
+            job["status"] = "failed"
+            job["progress"].update(stage="falhou")
+        finally:
+            job["finished_at"] = time.time()
+            with self._lock:
+                if self._in_flight.get(key) == job["job_id"]:
+                    del self._in_flight[key]
+
+    def _snapshot(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "job_id": job["job_id"],
+            "kind": job["kind"],
+            "params": job["params"],
+            "status": job["status"],
+            "progress": job["progress"].snapshot(),
+            "result": job["result"],
+            "error": job["error"],
+            "created_at": job["created_at"],
+            "finished_at": job["finished_at"],
+        }
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return self._snapshot(job) if job else None
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+
+def content_hash(*parts: Any) -> str:
+    """Hash estável (sha256) de qualquer conteúdo serializável em JSON."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Cache persistente (SQLite) das análises geradas pelo LLM. As entradas
+    expiram após `max_age` segundos e, acima de `max_entries`, as menos usadas
+    recentemente são removidas. Mantém contadores de acertos/falhas.
+    """
+
+    def __init__(self, path: str, max_entries: int = 500, max_age: float = 86400):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key         TEXT PRIMARY KEY,
+                    value       TEXT NOT NULL,
+                    created_at  REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] <= self.max_age:
+                self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                self._stats["hits"] += 1
+                return row[0]
+            if row:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._stats["evictions"] += 1
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            expired = self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.max_age,)).rowcount
+            overflow = self._conn.execute(
+                """
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,)
+            ).rowcount
+            self._stats["evictions"] += expired + overflow
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["entries"] = entries
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
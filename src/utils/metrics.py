@@ -0,0 +1,171 @@
+import contextvars
+import functools
+import inspect
+import re
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from prometheus_client import Counter, Histogram
+
+# Métricas Prometheus do pipeline Jira → filtro → LLM, expostas em /metrics
+JIRA_METHOD_SECONDS = Histogram(
+    "jira_client_method_seconds", "Tempo gasto em cada método do JiraClient", ["method"]
+)
+JIRA_REQUEST_SECONDS = Histogram(
+    "jira_request_seconds", "Duração das requisições HTTP ao Jira (incluindo retries)", ["endpoint"]
+)
+JIRA_REQUESTS = Counter(
+    "jira_requests_total", "Requisições HTTP ao Jira por endpoint e status", ["endpoint", "status"]
+)
+PIPELINE_STAGE_SECONDS = Histogram(
+    "pipeline_stage_seconds", "Tempo por estágio do pipeline de analytics", ["stage"]
+)
+DATABRICKS_REQUESTS = Counter(
+    "databricks_requests_total", "Requisições ao model serving do Databricks por modo e status", ["mode", "status"]
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_seconds", "Duração das inferências no Databricks", ["mode"],
+    buckets=(0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "Tokens de prompt e de resposta do LLM", ["kind"]
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds", "Duração das requisições à API", ["method", "route", "status"]
+)
+
+_ID_SEGMENT = re.compile(r"/(board|sprint|issue)/[^/]+")
+
+# Tempos por estágio da requisição em andamento (para o cabeçalho Server-Timing)
+_request_timings: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> dict:
+    timings = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def request_timings() -> Optional[dict]:
+    return _request_timings.get()
+
+
+@contextmanager
+def stage(name: str):
+    """Cronometra um estágio do pipeline: vai para o histograma e para os tempos da requisição atual."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        PIPELINE_STAGE_SECONDS.labels(name).observe(elapsed)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def timed_method(name: str):
+    """
+    Decorator para métodos do JiraClient. Em geradores (paginação) só conta o
+    tempo dentro do gerador, não o tempo do consumidor entre uma página e outra.
+    """
+    histogram = JIRA_METHOD_SECONDS.labels(name)
+
+    def decorator(fn):
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator_wrapper(*args, **kwargs):
+                iterator = fn(*args, **kwargs)
+                elapsed = 0.0
+                try:
+                    while True:
+                        start = time.perf_counter()
+                        try:
+                            item = next(iterator)
+                        except StopIteration:
+                            return
+                        finally:
+                            elapsed += time.perf_counter() - start
+                        yield item
+                finally:
+                    iterator.close()
+                    histogram.observe(elapsed)
+            return generator_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return wrapper
+
+    return decorator
+
+
+def jira_endpoint(url: str) -> str:
+    """Caminho da URL sem ids (board/sprint/issue), para não explodir a cardinalidade dos rótulos."""
+    path = url.split("://", 1)[-1]
+    path = path[path.find("/"):] if "/" in path else "/"
+    return _ID_SEGMENT.sub(r"/\1/{id}", path.split("?", 1)[0])
+
+
+def observe_jira_request(url: str, status, seconds: float) -> None:
+    endpoint = jira_endpoint(url)
+    JIRA_REQUEST_SECONDS.labels(endpoint).observe(seconds)
+    JIRA_REQUESTS.labels(endpoint, str(status)).inc()
+
+
+def observe_llm_request(mode: str, status, seconds: float, usage: Optional[dict] = None, completion_chunks: int = 0) -> None:
+    """Registra uma inferência; sem `usage` (modo stream), cada trecho recebido conta como um token de resposta."""
+    DATABRICKS_REQUESTS.labels(mode, str(status)).inc()
+    LLM_REQUEST_SECONDS.labels(mode).observe(seconds)
+    usage = usage or {}
+    if usage.get("prompt_tokens"):
+        LLM_TOKENS.labels("prompt").inc(usage["prompt_tokens"])
+    completion = usage.get("completion_tokens") or completion_chunks
+    if completion:
+        LLM_TOKENS.labels("completion").inc(completion)
+
+
+def server_timing_header(timings: dict, total: float) -> str:
+    """Valor do cabeçalho Server-Timing (durações em ms)."""
+    parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class ServerTimingMiddleware:
+    """
+    Middleware ASGI: abre os tempos por estágio de cada requisição, devolve o
+    detalhamento no cabeçalho Server-Timing e alimenta o histograma por rota.
+    Em respostas streaming o cabeçalho só cobre o que rodou antes do primeiro byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = start_request_timings()
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                header = server_timing_header(timings, time.perf_counter() - start)
+                message = dict(message, headers=[*message.get("headers", []), (b"server-timing", header.encode())])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope.get("method", ""), getattr(route, "path", "desconhecida"), str(status["code"])
+            ).observe(time.perf_counter() - start)
@@ -0,0 +1,142 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Categorias em ordem de prioridade, olhando do frame mais interno para fora
+_HTTP_MODULES = ("/socket.py", "/ssl.py", "/selectors.py", "/http/client.py", "/urllib3/", "/requests/", "/httpx/", "/httpcore/")
+_LLM_MARKERS = ("custom_llm.py", "/crewai/", "/litellm/", "/langchain_core/", "/openai/")
+_CATEGORIES = (
+    ("pandas", ("/pandas/", "/numpy/")),
+    ("crewai", ("/crewai/", "/litellm/", "/langchain_core/")),
+    ("sqlite", ("changelog_cache.py", "event_store.py", "llm_cache.py")),
+    ("espera_interna", ("/threading.py", "/queue.py", "/concurrent/futures/")),
+)
+
+
+def _stack(frame) -> List[str]:
+    """Arquivos/funções do frame mais interno para o mais externo."""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_filename}:{code.co_name}")
+        frame = frame.f_back
+    return stack
+
+
+def classify(stack: List[str]) -> str:
+    """
+    Atribui uma amostra a uma categoria: espera de HTTP (Jira ou LLM), CPU em
+    pandas/numpy, CrewAI/LangChain, caches SQLite, espera entre threads do
+    próprio pipeline ou código Python da aplicação. Vale o primeiro frame
+    reconhecido a partir do mais interno; chegar antes num frame de `src/` que
+    não é de cache conta como código da aplicação.
+    """
+    for entry in stack:
+        filename = entry.rsplit(":", 1)[0]
+        if any(module in filename for module in _HTTP_MODULES):
+            target = "llm" if any(marker in e for e in stack for marker in _LLM_MARKERS) else "jira"
+            return f"http_{target}"
+        for category, markers in _CATEGORIES:
+            if any(marker in filename for marker in markers):
+                return category
+        if filename.startswith(_SRC_DIR):
+            return "python_app"
+    return "python_app"
+
+
+class SamplingProfiler:
+    """
+    Profiler por amostragem: uma thread lê `sys._current_frames()` a cada
+    `interval` segundos e conta em que cada thread da aplicação está (só threads
+    com algum frame em `src/`, para ignorar workers ociosos). Não instala hooks
+    de trace; fora do bloco `with` não custa nada.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = 0
+        self.categories: Counter = Counter()
+        self.functions: Counter = Counter()
+        self.folded: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self.wall_s = 0.0
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = _stack(frame)
+                if not any(entry.startswith(_SRC_DIR) for entry in stack):
+                    continue
+                self.samples += 1
+                self.categories[classify(stack)] += 1
+                self.functions[self._short(stack[0])] += 1
+                self.folded[";".join(self._short(entry) for entry in reversed(stack))] += 1
+
+    @staticmethod
+    def _short(entry: str) -> str:
+        filename, function = entry.rsplit(":", 1)
+        if filename.startswith(_SRC_DIR):
+            filename = "src" + filename[len(_SRC_DIR):]
+        else:
+            marker = "site-packages/"
+            filename = filename.split(marker, 1)[1] if marker in filename else os.path.basename(filename)
+        return f"{filename}:{function}"
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.wall_s = time.perf_counter() - self._started
+        return False
+
+    def report(self, top: int = 25) -> Dict:
+        """
+        Resumo do perfil. `segundos_thread` soma todas as threads amostradas, então
+        pode passar do tempo de parede quando o crawl roda em paralelo.
+        """
+        total = self.samples or 1
+        return {
+            "wall_s": round(self.wall_s, 3),
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "atribuicao": {
+                category: {
+                    "amostras": count,
+                    "segundos_thread": round(count * self.interval, 3),
+                    "percentual": round(100 * count / total, 1),
+                }
+                for category, count in self.categories.most_common()
+            },
+            "top_funcoes": [
+                {"funcao": function, "amostras": count, "percentual": round(100 * count / total, 1)}
+                for function, count in self.functions.most_common(top)
+            ],
+        }
+
+    def save(self, directory: str, name: str) -> Dict[str, str]:
+        """Grava o resumo (JSON) e as pilhas no formato "folded" (para flamegraph.pl/speedscope)."""
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, f"{datetime.now():%Y%m%d-%H%M%S}-{name}")
+        with open(f"{stem}.json", "w", encoding="utf-8") as f:
+            json.dump(self.report(top=100), f, indent=2, ensure_ascii=False)
+        with open(f"{stem}.folded", "w", encoding="utf-8") as f:
+            for stack, count in self.folded.most_common():
+                f.write(f"{stack} {count}\n")
+        return {"resumo": f"{stem}.json", "pilhas": f"{stem}.folded"}
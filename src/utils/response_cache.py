@@ -0,0 +1,118 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+# Locks de cálculo por faixa de chaves: número fixo, em vez de um lock por chave já pedida
+_KEY_LOCK_STRIPES = 64
+
+
+class ResponseCache:
+    """
+    Cache persistente (SQLite) das respostas das rotas, compartilhado por todos
+    os workers da API e, por consequência, por todas as instâncias do dashboard
+    que a consultam por HTTP. As entradas valem por `ttl` segundos; acima de
+    `max_entries`, as mais antigas são removidas. Chamadas concorrentes para a
+    mesma chave esperam um único cálculo.
+    """
+
+    def __init__(self, path: str, ttl: float = 900, max_entries: int = 200):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(_KEY_LOCK_STRIPES)]
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key         TEXT PRIMARY KEY,
+                    value       TEXT NOT NULL,
+                    created_at  REAL NOT NULL
+                )
+                """
+            )
+
+    def _read(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM response_cache WHERE key = ?", (key,)).fetchone()
+        if row and time.time() - row[1] <= self.ttl:
+            return json.loads(row[0])
+        return None
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._read(key)
+        with self._lock:
+            self._stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        now = time.time()
+        raw = json.dumps(jsonable_encoder(value), ensure_ascii=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, raw, now)
+            )
+            expired = self._conn.execute("DELETE FROM response_cache WHERE created_at < ?", (now - self.ttl,)).rowcount
+            overflow = self._conn.execute(
+                """
+                DELETE FROM response_cache WHERE key IN (
+                    SELECT key FROM response_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,)
+            ).rowcount
+            self._stats["evictions"] += expired + overflow
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        # Chaves diferentes na mesma faixa só esperam uma pela outra; a mesma chave sempre cai na mesma
+        return self._key_locks[hash(key) % len(self._key_locks)]
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        refresh: bool = False,
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Devolve a resposta em cache ou calcula, grava e devolve. `refresh=True`
+        recalcula mesmo com entrada válida (usado no aquecimento); `cacheable`
+        decide se o resultado pode ser gravado (ex.: não guardar falhas do LLM).
+        O valor devolvido é sempre o serializado em JSON, igual ao da API.
+        """
+        if not refresh:
+            value = self.get(key)
+            if value is not None:
+                return value
+        with self._key_lock(key):
+            if not refresh:
+                # Outra requisição pode ter calculado enquanto esperávamos
+                value = self._read(key)
+                if value is not None:
+                    with self._lock:
+                        self._stats["coalesced"] += 1
+                    return value
+            value = jsonable_encoder(compute())
+            if cacheable is None or cacheable(value):
+                self.put(key, value)
+            return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["entries"] = entries
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
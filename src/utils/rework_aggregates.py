@@ -0,0 +1,221 @@
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+import threading
+
+from src.utils.rework_search import ReworkEventTable, parse_jira_timestamps
+
+STATUS_CONCLUSAO = frozenset(['Em produção', 'Em release', 'Em Homologação'])
+STATUS_REPROVADO = 'Reprovado'
+
+
+class _Bucket:
+    """Contagens de um dia para um par (sprints da issue, desenvolvedor)."""
+
+    __slots__ = ("reprovas", "reprovados", "concluidos")
+
+    def __init__(self):
+        self.reprovas = 0
+        # Cards distintos, só onde a contagem é de cards: reprovados e concluídos (card -> sp)
+        self.reprovados = set()
+        self.concluidos = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.reprovas or self.concluidos)
+
+
+def _as_day(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+class ReworkAggregateStore:
+    """
+    Agregados de retrabalho mantidos de forma incremental, em buckets por dia,
+    conjunto de sprints da issue e desenvolvedor (responsável). Uma consulta de
+    janela (15 dias, diária) percorre só os buckets dos dias do período, em vez
+    de refazer filtro e deduplicação sobre todo o histórico.
+
+    As definições são as mesmas do agente: `total_concluidos` e
+    `total_reprovados` contam cards distintos e `total_reprovas` conta
+    reprovações distintas por (card, status, responsável, data, sp). Cada
+    bucket guarda só contagens e os cards distintos; a granularidade é o dia.
+    Uma issue em várias sprints (card que passou de uma sprint para a outra)
+    entra uma vez, num bucket que responde por todas elas. Reingerir uma
+    issue substitui os eventos que ela tinha antes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._days: Dict[date, Dict[tuple, _Bucket]] = defaultdict(dict)
+        # issue_key -> sprints conhecidas da issue
+        self._issue_sprints: Dict[str, frozenset] = {}
+        # issue_key -> {(dia, responsável): [reprovas, concluído, sp]}, para remover ou mover a contribuição da issue
+        self._issue_buckets: Dict[str, Dict[tuple, list]] = {}
+
+    def _apply(self, issue_key: str, day: date, responsavel, contribution: list, add: bool):
+        buckets = self._days[day] if add else self._days.get(day, {})
+        key = (self._issue_sprints.get(issue_key, frozenset()), responsavel)
+        bucket = buckets.get(key)
+        reprovas, concluido, sp = contribution
+        if add:
+            if bucket is None:
+                bucket = buckets[key] = _Bucket()
+            bucket.reprovas += reprovas
+            if reprovas:
+                bucket.reprovados.add(issue_key)
+            if concluido:
+                bucket.concluidos[issue_key] = sp
+            return
+        if bucket is None:
+            return
+        bucket.reprovas -= reprovas
+        bucket.reprovados.discard(issue_key)
+        bucket.concluidos.pop(issue_key, None)
+        if not bucket:
+            del buckets[key]
+            if not buckets:
+                del self._days[day]
+
+    def _remove_issue(self, issue_key: str):
+        for (day, responsavel), contribution in self._issue_buckets.pop(issue_key, {}).items():
+            self._apply(issue_key, day, responsavel, contribution, add=False)
+
+    def _set_sprints(self, issue_key: str, sprint_ids: set, exact: bool = False):
+        """
+        Soma sprints à issue (ou, com `exact`, troca o conjunto); se ele mudou, a
+        contribuição dela passa para os buckets do novo conjunto.
+        """
+        current = self._issue_sprints.get(issue_key, frozenset())
+        merged = frozenset(sprint_ids) if exact else current | sprint_ids
+        if merged == current:
+            return
+        contributions = self._issue_buckets.get(issue_key, {})
+        for (day, responsavel), contribution in contributions.items():
+            self._apply(issue_key, day, responsavel, contribution, add=False)
+        self._issue_sprints[issue_key] = merged
+        for (day, responsavel), contribution in contributions.items():
+            self._apply(issue_key, day, responsavel, contribution, add=True)
+
+    def _add_event(self, card_key, responsavel, status, data_mudanca, sp):
+        if status in STATUS_CONCLUSAO:
+            reprovas, concluido = 0, True
+        elif status == STATUS_REPROVADO:
+            reprovas, concluido = 1, False
+        else:
+            return
+        day = data_mudanca.date()
+        contributions = self._issue_buckets.setdefault(card_key, {})
+        contribution = contributions.get((day, responsavel))
+        if contribution is None:
+            contributions[(day, responsavel)] = contribution = [0, False, None]
+        else:
+            self._apply(card_key, day, responsavel, contribution, add=False)
+        contribution[0] += reprovas
+        if concluido and not contribution[1]:
+            # Como no agente, vale o sp da primeira conclusão do card
+            contribution[1], contribution[2] = True, sp
+        self._apply(card_key, day, responsavel, contribution, add=True)
+
+    def ingest(
+        self,
+        events: ReworkEventTable,
+        memberships: Iterable[Tuple[str, Any]] = (),
+        replace: bool = True,
+        crawled_sprints: Iterable = (),
+        exact_memberships: bool = False
+    ):
+        """
+        Incorpora os eventos de uma tabela. `memberships` traz os pares
+        (issue, sprint), como no armazenamento local; uma issue pode aparecer
+        em várias sprints. Com `replace=True` (crawl completo da issue) os
+        eventos anteriores de cada issue presente são descartados; com
+        `replace=False` (ex.: webhook) os eventos, já sem os repetidos, são
+        somados aos existentes. Os vínculos com sprints seguem o
+        armazenamento local: issues que não vieram em `crawled_sprints`
+        saem delas e, com `exact_memberships`, `memberships` traz todas as
+        sprints atuais das issues.
+        """
+        sprints_by_issue = defaultdict(set)
+        for issue_key, sprint_id in memberships:
+            if issue_key:
+                sprints_by_issue[issue_key].add(str(sprint_id))
+        rows = ()
+        if len(events):
+            import pandas as pd
+
+            datas = parse_jira_timestamps(events.datas)
+            sps = pd.to_numeric(pd.Series(events.sps, dtype=object), errors='coerce')
+            rows = [
+                (card_key, responsavel, status, data_mudanca, None if pd.isna(sp) else float(sp))
+                for card_key, responsavel, status, data_mudanca, sp in zip(
+                    events.card_keys, events.responsaveis, events.statuses, datas, sps
+                )
+                if not pd.isna(data_mudanca)
+            ]
+        with self._lock:
+            if replace:
+                for issue_key in set(events.card_keys) | set(sprints_by_issue):
+                    self._remove_issue(issue_key)
+            for issue_key, sprint_ids in sprints_by_issue.items():
+                self._set_sprints(issue_key, sprint_ids, exact=exact_memberships)
+            crawled = {str(s) for s in crawled_sprints}
+            if crawled:
+                for issue_key, sprint_ids in list(self._issue_sprints.items()):
+                    stale = (sprint_ids & crawled) - sprints_by_issue.get(issue_key, set())
+                    if stale:
+                        self._set_sprints(issue_key, sprint_ids - stale, exact=True)
+            # Um card em várias sprints do mesmo crawl vem repetido na tabela
+            seen = set()
+            for row in rows:
+                if row in seen:
+                    continue
+                seen.add(row)
+                self._add_event(*row)
+
+    def metrics(
+        self,
+        start: date,
+        end: date,
+        sprint_ids: Optional[Iterable] = None,
+        responsaveis: Optional[Iterable[str]] = None,
+        by_developer: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Métricas dos dias de `start` a `end` (inclusive; datetimes valem pelo
+        dia) somando os buckets, com detalhamento por desenvolvedor, se pedido.
+        Com `sprint_ids`, entram as issues de qualquer uma das sprints.
+        """
+        sprint_ids = {str(s) for s in sprint_ids} if sprint_ids is not None else None
+        responsaveis = set(responsaveis) if responsaveis is not None else None
+        concluded = {}
+        rejected = set()
+        reprovas = defaultdict(int)
+        with self._lock:
+            for day in sorted(d for d in self._days if _as_day(start) <= d <= _as_day(end)):
+                for (sprints, responsavel), bucket in self._days[day].items():
+                    if sprint_ids is not None and sprints.isdisjoint(sprint_ids):
+                        continue
+                    if responsaveis is not None and responsavel not in responsaveis:
+                        continue
+                    # Dias em ordem: fica a primeira conclusão de cada card
+                    for card_key, sp in bucket.concluidos.items():
+                        concluded.setdefault(card_key, (sp, responsavel))
+                    rejected |= bucket.reprovados
+                    reprovas[responsavel] += bucket.reprovas
+
+        result = {
+            "total_concluidos": len(concluded),
+            "total_reprovados": len(rejected),
+            "total_reprovas": sum(reprovas.values()),
+            "sp_concluidos": sum(sp or 0 for sp, _ in concluded.values()),
+        }
+        if by_developer:
+            developers = defaultdict(lambda: {"concluidos": 0, "reprovas": 0, "sp_concluidos": 0.0})
+            for sp, responsavel in concluded.values():
+                developers[responsavel]["concluidos"] += 1
+                developers[responsavel]["sp_concluidos"] += sp or 0
+            for responsavel, count in reprovas.items():
+                if count:
+                    developers[responsavel]["reprovas"] += count
+            result["por_desenvolvedor"] = dict(developers)
+        return result
@@ -1,3 +1,10 @@
+import sys
+from typing import TYPE_CHECKING, Any, Iterable, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
 def filter_reprovado_entries(
     issue_key: str,
     dev: str,
@@ -23,3 +30,114 @@ def filter_reprovado_entries(
                 reprovado_entries.append(entry)
     
     return reprovado_entries
+
+
+REWORK_STATUSES = ['Reprovado', 'Em produção', 'Em release', 'Em Homologação']
+_REWORK_STATUS_SET = frozenset(REWORK_STATUSES)
+_JIRA_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def parse_jira_timestamps(values) -> "pd.Series":
+    """
+    Converte datas do changelog (ex.: 2024-05-01T10:00:00.000-0300) para
+    datetime64 sem fuso, mantendo o horário local do Jira, como o
+    `tz_localize(None)` do agente. O formato padrão é lido de forma vetorizada;
+    só as datas fora dele passam pelo parser genérico.
+    """
+    import pandas as pd
+
+    raw = pd.Series(values, dtype=object)
+    parsed = pd.to_datetime(raw.str.slice(0, 23), format=_JIRA_TIMESTAMP_FORMAT, errors='coerce')
+    fallback = parsed.isna() & raw.notna()
+    if fallback.any():
+        parsed[fallback] = pd.to_datetime(
+            raw[fallback].str.replace(r'(Z|[+-]\d{2}:?\d{2})$', '', regex=True),
+            format='ISO8601', errors='coerce'
+        )
+    return parsed
+
+
+class ReworkEventTable:
+    """
+    Eventos de retrabalho (mesmos campos de `filter_reprovado_entries`)
+    guardados em colunas, com nomes e chaves internados, em vez de um
+    dicionário por evento. Vai do fetch dos changelogs até o agente; a
+    conversão para registros/JSON só acontece na borda (`to_records`).
+    """
+
+    __slots__ = ("card_keys", "responsaveis", "desenvolvedores", "statuses", "datas", "sps")
+
+    def __init__(self):
+        self.card_keys = []
+        self.responsaveis = []
+        self.desenvolvedores = []
+        self.statuses = []
+        self.datas = []
+        self.sps = []
+
+    def __len__(self) -> int:
+        return len(self.card_keys)
+
+    def add_issue(self, issue_key: str, dev: Any, sp: Any, changelog_data: dict, assignee: dict) -> int:
+        """Mesma regra de `filter_reprovado_entries`; retorna quantos eventos foram adicionados."""
+        histories = changelog_data.get('changelog', {}).get('histories', [])
+        issue_key = _intern(issue_key)
+        responsavel = _intern(assignee.get('displayName', 'Não atribuído'))
+        if isinstance(dev, dict) and 'value' in dev:
+            dev = dev['value']
+        dev = _intern(dev)
+        added = 0
+        for history in histories:
+            for item in history.get('items', ()):
+                status = item.get('toString')
+                if status in _REWORK_STATUS_SET:
+                    self.card_keys.append(issue_key)
+                    self.responsaveis.append(responsavel)
+                    self.desenvolvedores.append(dev)
+                    self.statuses.append(_intern(status))
+                    self.datas.append(history.get('created'))
+                    self.sps.append(sp)
+                    added += 1
+        return added
+
+    def extend(self, other: "ReworkEventTable") -> None:
+        for name in self.__slots__:
+            getattr(self, name).extend(getattr(other, name))
+
+    def to_frame(self) -> "pd.DataFrame":
+        """DataFrame tipado: status e nomes categóricos, datetime64 e `sp` em float."""
+        import pandas as pd
+
+        return pd.DataFrame({
+            'card_key': pd.Categorical(self.card_keys),
+            'responsavel': pd.Categorical(self.responsaveis),
+            'desenvolvedor': pd.Categorical(self.desenvolvedores),
+            'status_novo': pd.Categorical(self.statuses, categories=REWORK_STATUSES),
+            'data_mudanca': parse_jira_timestamps(self.datas),
+            'sp': pd.to_numeric(pd.Series(self.sps, dtype=object), errors='coerce').astype('float64'),
+        })
+
+
+def frame_to_records(df: "pd.DataFrame") -> list:
+    """Converte o DataFrame tipado em registros para a resposta JSON (NaN/NaT viram None)."""
+    if df.empty:
+        return []
+    return df.astype(object).where(df.notna(), None).to_dict(orient='records')
+
+
+def extract_rework_frame(issues: Iterable[Tuple[str, Any, Any, dict, dict]]) -> "pd.DataFrame":
+    """
+    Caminho colunar de `filter_reprovado_entries` para muitas issues de uma vez.
+    Recebe tuplas (issue_key, dev, sp, changelog_data, assignee) e devolve um
+    DataFrame com as mesmas colunas, já tipado: status e nomes categóricos,
+    `data_mudanca` em datetime64 e `sp` em float. Não cria um dicionário por
+    item do changelog.
+    """
+    table = ReworkEventTable()
+    for issue_key, dev, sp, changelog_data, assignee in issues:
+        table.add_issue(issue_key, dev, sp, changelog_data, assignee)
+    return table.to_frame()
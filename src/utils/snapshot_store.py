@@ -0,0 +1,85 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+
+class SnapshotStore:
+    """
+    Última versão pré-calculada de cada visão de analytics (SQLite, para
+    sobreviver a reinícios e valer para todos os workers). Um snapshot é
+    servido até o próximo ser gerado, junto com o horário de geração; se o
+    agendador parar, deixa de ser servido após `max_age` segundos. Snapshots
+    não regravados há mais de `retention` segundos (ex.: visões diárias de
+    dias anteriores) são removidos.
+    """
+
+    def __init__(self, path: str, max_age: Optional[float] = None, retention: float = 7 * 86400):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_age = max_age
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    key           TEXT PRIMARY KEY,
+                    view          TEXT NOT NULL,
+                    params        TEXT NOT NULL,
+                    value         TEXT NOT NULL,
+                    generated_at  REAL NOT NULL,
+                    duration_s    REAL
+                )
+                """
+            )
+
+    @staticmethod
+    def _with_timestamp(value: Any, generated_at: float) -> Any:
+        return {**value, "generated_at": datetime.fromtimestamp(generated_at).isoformat(timespec="seconds")}
+
+    def get(self, key: str) -> Optional[Any]:
+        """Snapshot mais recente da chave, com `generated_at`, ou None (também se passou de `max_age`)."""
+        with self._lock:
+            row = self._conn.execute("SELECT value, generated_at FROM snapshots WHERE key = ?", (key,)).fetchone()
+        if row is None or (self.max_age is not None and time.time() - row[1] > self.max_age):
+            return None
+        return self._with_timestamp(json.loads(row[0]), row[1])
+
+    def put(self, key: str, view: str, params: dict, value: Any, duration_s: Optional[float] = None) -> Any:
+        """Grava o snapshot e o devolve já com `generated_at`."""
+        now = time.time()
+        value = jsonable_encoder(value)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots (key, view, params, value, generated_at, duration_s) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, view, json.dumps(params, sort_keys=True), json.dumps(value, ensure_ascii=False), now, duration_s)
+            )
+            self._conn.execute("DELETE FROM snapshots WHERE generated_at < ?", (now - self.retention,))
+        return self._with_timestamp(value, now)
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT view, params, generated_at, duration_s FROM snapshots ORDER BY view, generated_at DESC"
+            ).fetchall()
+        return {
+            "entries": len(rows),
+            "snapshots": [
+                {
+                    "view": view,
+                    "params": json.loads(params),
+                    "generated_at": datetime.fromtimestamp(generated_at).isoformat(timespec="seconds"),
+                    "duration_s": round(duration_s, 3) if duration_s is not None else None,
+                }
+                for view, params, generated_at, duration_s in rows
+            ],
+        }
@@ -0,0 +1,185 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterable, List, Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def parse_jira_date(value: Optional[str]) -> Optional[datetime]:
+    """Converte datas ISO do Jira (ex.: 2024-05-01T10:00:00.000Z) em datetime com fuso."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _sprint_recency_key(sprint: dict):
+    # Sprints sem data (ex.: futuras) ficam depois das datadas; entre elas, o id mais alto é o mais novo
+    start = parse_jira_date(sprint.get("startDate") or sprint.get("activatedDate") or sprint.get("createdDate"))
+    sprint_id = sprint.get("id")
+    return (start is not None, start.timestamp() if start else 0, sprint_id if isinstance(sprint_id, int) else 0)
+
+
+def sort_sprints_by_recency(sprints: Iterable[dict]) -> List[dict]:
+    """Ordena da sprint mais recente para a mais antiga, mesmo quando faltam datas."""
+    return sorted(sprints, key=_sprint_recency_key, reverse=True)
+
+
+RECENT_STATES = ("active", "closed")
+
+
+class SprintIndex:
+    """
+    Índice de boards e sprints compartilhado pelo processo. É reconstruído a
+    cada `ttl_seconds`, buscando as sprints de todos os boards em paralelo, e
+    permite consultar sprints por estado/data de início e os boards de uma
+    sprint em O(1).
+    """
+
+    def __init__(self, jira_client, ttl_seconds: float = 600, max_workers: int = 8):
+        self.jira_client = jira_client
+        self.ttl_seconds = ttl_seconds
+        self.max_workers = max(1, max_workers)
+        self._lock = threading.Lock()
+        self._built_at = None
+        self._boards = []
+        self._sprints_by_board = {}
+        self._sprints = {}
+        self._boards_only = []
+        self._boards_at = None
+        self._recent = {}
+
+    def _fetch_board_sprints(self, board_id):
+        try:
+            return self.jira_client.get_sprints_by_board(board_id)
+        except Exception as e:
+            if "O quadro não aceita sprints" in str(e):
+                logger.warning(f"Board {board_id} não aceita sprints. Pulando esse board.")
+                return None
+            raise
+
+    def _build(self):
+        boards = self.jira_client.get_all_boards()
+        board_ids = [board.get("id") for board in boards]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(self._fetch_board_sprints, board_ids))
+
+        sprints_by_board = {}
+        unique_sprints = {}
+        for board_id, sprints in zip(board_ids, results):
+            if sprints is None:
+                continue
+            sprints_by_board[str(board_id)] = sprints
+            for sprint in sprints:
+                key = str(sprint.get("id"))
+                if key not in unique_sprints:
+                    unique_sprints[key] = dict(sprint, boards=[board_id])
+                elif board_id not in unique_sprints[key]["boards"]:
+                    unique_sprints[key]["boards"].append(board_id)
+
+        self._boards = boards
+        self._sprints_by_board = sprints_by_board
+        self._sprints = unique_sprints
+        self._built_at = time.monotonic()
+        logger.info(f"Índice de sprints reconstruído: {len(boards)} boards, {len(unique_sprints)} sprints.")
+
+    def _ensure_fresh(self):
+        with self._lock:
+            if self._built_at is None or time.monotonic() - self._built_at > self.ttl_seconds:
+                self._build()
+
+    def invalidate(self):
+        with self._lock:
+            self._built_at = None
+            self._boards_at = None
+            self._recent = {}
+
+    def boards(self) -> List[dict]:
+        self._ensure_fresh()
+        return self._boards
+
+    def sprints_for_board(self, board_id) -> List[dict]:
+        """Sprints de um board, como retornadas pelo Jira (boards fora do índice são buscados direto)."""
+        self._ensure_fresh()
+        sprints = self._sprints_by_board.get(str(board_id))
+        if sprints is None:
+            return self.jira_client.get_sprints_by_board(board_id)
+        return sprints
+
+    def boards_for_sprint(self, sprint_id) -> List:
+        self._ensure_fresh()
+        sprint = self._sprints.get(str(sprint_id))
+        return list(sprint["boards"]) if sprint else []
+
+    def sprints(self, states: Optional[Iterable[str]] = None, started_after: Optional[datetime] = None) -> List[dict]:
+        """Sprints únicas (com a lista de `boards`), filtradas por estado e data de início."""
+        self._ensure_fresh()
+        states = set(states) if states else None
+        selected = []
+        for sprint in self._sprints.values():
+            if states and sprint.get("state") not in states:
+                continue
+            if started_after is not None:
+                start = parse_jira_date(sprint.get("startDate"))
+                if start is None or start < started_after:
+                    continue
+            selected.append(sprint)
+        return selected
+
+    def _board_list(self) -> List[dict]:
+        """Lista de boards sem forçar a montagem do índice completo de sprints."""
+        with self._lock:
+            if self._built_at is not None and time.monotonic() - self._built_at <= self.ttl_seconds:
+                return self._boards
+            if self._boards_at is None or time.monotonic() - self._boards_at > self.ttl_seconds:
+                self._boards_only = self.jira_client.get_all_boards()
+                self._boards_at = time.monotonic()
+            return self._boards_only
+
+    def _fetch_recent_board_sprints(self, board_id, num_sprints):
+        try:
+            return self.jira_client.get_recent_sprints(board_id, num_sprints, states=RECENT_STATES)
+        except Exception as e:
+            if "O quadro não aceita sprints" in str(e):
+                logger.warning(f"Board {board_id} não aceita sprints. Pulando esse board.")
+                return None
+            raise
+
+    def _recent_sprints(self, num_sprints: int) -> List[dict]:
+        """
+        Busca em paralelo apenas as sprints ativas/fechadas mais recentes de cada
+        board (o Jira filtra por estado e a leitura começa pelo fim da lista).
+        As N mais recentes no geral estão entre as N mais recentes de cada board.
+        """
+        cached = self._recent.get(num_sprints)
+        if cached and time.monotonic() - cached[0] <= self.ttl_seconds:
+            return cached[1]
+        board_ids = [board.get("id") for board in self._board_list()]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(lambda b: self._fetch_recent_board_sprints(b, num_sprints), board_ids))
+        unique_sprints = {}
+        for board_id, sprints in zip(board_ids, results):
+            for sprint in sprints or []:
+                key = str(sprint.get("id"))
+                if key not in unique_sprints:
+                    unique_sprints[key] = dict(sprint, boards=[board_id])
+                elif board_id not in unique_sprints[key]["boards"]:
+                    unique_sprints[key]["boards"].append(board_id)
+        selected = sort_sprints_by_recency(unique_sprints.values())
+        self._recent[num_sprints] = (time.monotonic(), selected)
+        return selected
+
+    def latest_sprints(self, num_sprints: int, mode: str = "recent") -> List[dict]:
+        """
+        As `num_sprints` sprints mais recentes. No modo "recent" (padrão) só as
+        sprints ativas/fechadas do fim de cada board são lidas; no modo "full"
+        usa o índice completo, incluindo sprints futuras.
+        """
+        if mode == "recent":
+            return self._recent_sprints(num_sprints)[:num_sprints]
+        return sort_sprints_by_recency(self.sprints())[:num_sprints]
@@ -1,19 +1,28 @@
 import streamlit as st
-import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from datetime import datetime
 
-# Import direto das rotas, sem usar importlib
-from src.routes.jira_routes import (
-    get_all_analytics,
-    get_daily_all_analytics,
-    get_analitycs_with_changelogs,
-    get_analitycs_daily,
-    list_boards,
-    list_sprints,
-)
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+import src.config.config as config
+
+# Com DASHBOARD_API_URL o dashboard é só cliente HTTP da API (crawl, LLM e cache
+# compartilhado ficam no serviço); sem ela, chama as rotas no próprio processo
+CLIENT_MODE = bool(config.DASHBOARD_API_URL)
+# No modo cliente o cache de verdade é o da API; o local só evita repetir chamadas em cada rerun
+LOCAL_CACHE_TTL = 60 if CLIENT_MODE else 3600
+
+
+@st.cache_resource
+def get_backend():
+    if CLIENT_MODE:
+        from src.utils.api_client import AnalyticsAPIClient
+        return AnalyticsAPIClient(config.DASHBOARD_API_URL, timeout=config.DASHBOARD_API_TIMEOUT)
+    import src.routes.jira_routes as jira_routes
+    return jira_routes
 
 st.set_page_config(
     page_title="JIRA Analytics",
@@ -41,13 +50,19 @@ def format_metric(value: int, title: str) -> str:
     </div>
     """
 
-def plot_responsavel_performance(df: pd.DataFrame, title: str) -> Optional[plt.Figure]:
+def _pyplot():
+    # matplotlib só é carregado quando há gráfico para desenhar
+    import matplotlib.pyplot as plt
+    return plt
+
+def plot_responsavel_performance(df: pd.DataFrame, title: str) -> Optional["Figure"]:
     try:
         if df.empty or 'responsavel' not in df.columns:
             return None
         counts = df['responsavel'].value_counts()
         if counts.empty:
             return None
+        plt = _pyplot()
         fig, ax = plt.subplots(figsize=(12, 7))
         colors = plt.cm.viridis_r(np.linspace(0.2, 0.8, len(counts)))
         counts.plot(kind='barh', ax=ax, color=colors, title=title)
@@ -61,7 +76,7 @@ def plot_responsavel_performance(df: pd.DataFrame, title: str) -> Optional[plt.F
         st.error(f"Erro ao gerar gráfico: {str(e)}")
         return None
 
-def plot_sp_conclusions(df: pd.DataFrame, title: str) -> Optional[plt.Figure]:
+def plot_sp_conclusions(df: pd.DataFrame, title: str) -> Optional["Figure"]:
     try:
         if df.empty or 'responsavel' not in df.columns or 'sp' not in df.columns:
             return None
@@ -69,6 +84,7 @@ def plot_sp_conclusions(df: pd.DataFrame, title: str) -> Optional[plt.Figure]:
         sp_sum = df.groupby('responsavel')['sp'].sum().sort_values(ascending=False)
         if sp_sum.empty:
             return None
+        plt = _pyplot()
         fig, ax = plt.subplots(figsize=(12, 7))
         colors = plt.cm.viridis_r(np.linspace(0.2, 0.8, len(sp_sum)))
         sp_sum.plot(kind='barh', ax=ax, color=colors, title=title)
@@ -153,25 +169,96 @@ def normalize_issues_list(issues_list: list) -> pd.DataFrame:
     return df
 
 
-@st.cache_data(ttl=3600, show_spinner="Carregando dados para consulta específica (15 dias)...")
+@st.cache_data(ttl=LOCAL_CACHE_TTL, show_spinner="Carregando dados para consulta específica (15 dias)...")
 def fetch_specific_15days(board_id: str, sprint_id: str):
-    return get_analitycs_with_changelogs(board_id, sprint_id)
+    return get_backend().get_analitycs_with_changelogs(board_id, sprint_id)
 
-@st.cache_data(ttl=3600, show_spinner="Carregando dados para consulta específica (diária)...")
+@st.cache_data(ttl=LOCAL_CACHE_TTL, show_spinner="Carregando dados para consulta específica (diária)...")
 def fetch_specific_daily(board_id: str, sprint_id: str):
-    return get_analitycs_daily(board_id, sprint_id)
+    return get_backend().get_analitycs_daily(board_id, sprint_id)
 
-@st.cache_data(ttl=3600, show_spinner="Carregando dados para todos os boards e sprints (15 dias)...")
+@st.cache_data(ttl=LOCAL_CACHE_TTL, show_spinner="Carregando dados para todos os boards e sprints (15 dias)...")
 def fetch_all_15days(num_sprints: int):
     try:
-        return get_all_analytics(num_sprints=num_sprints)
+        return get_backend().get_all_analytics(num_sprints=num_sprints)
     except Exception as e:
         st.error(f"Erro ao obter analytics: {str(e)}")
         return {}
 
-@st.cache_data(ttl=3600, show_spinner="Carregando dados para todos os boards e sprints (diária)...")
+@st.cache_data(ttl=LOCAL_CACHE_TTL, show_spinner="Carregando dados para todos os boards e sprints (diária)...")
 def fetch_all_daily(num_sprints: int):
-    return get_daily_all_analytics(num_sprints=num_sprints)
+    return get_backend().get_daily_all_analytics(num_sprints=num_sprints)
+
+def render_charts_data(charts_data: dict):
+    """Desenha métricas e gráficos de um `charts_data` (usado a cada atualização do streaming)."""
+    metrics = charts_data.get("metrics", {})
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown(format_metric(metrics.get('total_concluidos', 0), "Concluídos"), unsafe_allow_html=True)
+    with col2:
+        st.markdown(format_metric(metrics.get('total_reprovados', 0), "Reprovados"), unsafe_allow_html=True)
+    with col3:
+        st.markdown(format_metric(metrics.get('total_reprovas', 0), "Reprovações"), unsafe_allow_html=True)
+    concl_df = process_dataframe(pd.DataFrame(charts_data.get('conclusoes', [])), "Conclusões")
+    reprov_df = process_dataframe(pd.DataFrame(charts_data.get('reprovacoes', [])), "Reprovações")
+    st.header("Gráficos de Desempenho")
+    col_g1, col_g2, col_g3 = st.columns(3)
+    charts = [
+        (col_g1, plot_responsavel_performance, concl_df, "Conclusões Bem-sucedidas", "Sem dados de conclusões"),
+        (col_g2, plot_responsavel_performance, reprov_df, "Reprovações por Responsável", "Sem dados de reprovações"),
+        (col_g3, plot_sp_conclusions, concl_df, "Story Points - Conclusões", "Sem dados para Story Points"),
+    ]
+    for column, plot, df, title, empty_msg in charts:
+        with column:
+            fig = plot(df, title)
+            if fig:
+                st.pyplot(fig)
+                _pyplot().close(fig)
+            else:
+                st.info(empty_msg)
+    return concl_df, reprov_df
+
+
+def run_all_15days_streaming(num_sprints: int):
+    """Consome o streaming de analytics e atualiza a tela a cada sprint processada."""
+    st.title("📊 Análise de Performance - Todos Boards e Sprints (15 dias)")
+    status = st.empty()
+    charts_area = st.empty()
+    narrative_area = st.empty()
+    narrative = ""
+    failed = False
+    status.info("Selecionando sprints...")
+    for event in get_backend().iter_all_analytics(num_sprints):
+        if event["type"] == "sprints":
+            status.info(f"{len(event['sprints'])} sprints selecionadas. Buscando changelogs...")
+        elif event["type"] == "partial":
+            status.info(f"Sprints processadas: {event['sprints_done']}/{event['sprints_total']}")
+            with charts_area.container():
+                render_charts_data(event["charts_data"])
+        elif event["type"] == "narrative":
+            status.info("Gerando insights analíticos...")
+            narrative += event["delta"]
+            narrative_area.markdown(f"```\n{narrative}\n```")
+        elif event["type"] == "final":
+            if not failed:
+                status.empty()
+            narrative_area.empty()
+            analysis = event["analysis"]
+            with charts_area.container():
+                concl_df, reprov_df = render_charts_data(analysis.get("charts_data", {}))
+            st.header("Insights Analíticos")
+            with st.expander("Ver Análise Detalhada"):
+                st.markdown(f"```\n{analysis.get('llm_analysis', 'Análise não disponível')}\n```")
+            st.header("Dados Detalhados")
+            tab1, tab2 = st.tabs(["Conclusões", "Reprovações"])
+            with tab1:
+                st.dataframe(concl_df, hide_index=True, use_container_width=True)
+            with tab2:
+                st.dataframe(reprov_df, hide_index=True, use_container_width=True)
+        elif event["type"] == "error":
+            failed = True
+            status.error(f"Erro ao obter analytics: {event['detail']}")
+
 
 with st.sidebar:
     st.title("Configurações")
@@ -179,7 +266,7 @@ with st.sidebar:
     periodo = st.radio("Selecione o período:", options=["Diário", "15 dias"])
     if modo_consulta == "Consulta Específica":
         try:
-            boards_data = list_boards()
+            boards_data = get_backend().list_boards()
             boards = boards_data.get("boards", [])
         except Exception as e:
             st.error(f"Erro ao carregar boards: {e}")
@@ -188,7 +275,7 @@ with st.sidebar:
             board_options = {str(b["id"]): b.get("name", f"Board {b['id']}") for b in boards}
             selected_board_id = st.selectbox("Selecione o Board", options=list(board_options.keys()), format_func=lambda x: board_options[x])
             try:
-                sprints_data = list_sprints(selected_board_id)
+                sprints_data = get_backend().list_sprints(selected_board_id)
                 sprints = sprints_data.get("sprints", [])
             except Exception as e:
                 st.error(f"Erro ao carregar sprints: {e}")
@@ -199,6 +286,7 @@ with st.sidebar:
     else:
         st.info("A consulta será realizada em TODOS os boards e sprints.")
         num_sprints = st.number_input("Número de últimas sprints para análise", min_value=1, value=2, step=1)
+        progressivo = st.checkbox("Renderização progressiva", value=True, help="Mostra os gráficos conforme cada sprint é processada.")
     run_query = st.button("Run")
 
 if run_query:
@@ -282,7 +370,13 @@ if run_query:
                 st.error(f"Erro crítico: {str(e)}")
                 st.exception(e)
     else:
-        if periodo == "15 dias":
+        if periodo == "15 dias" and progressivo:
+            try:
+                run_all_15days_streaming(num_sprints)
+            except Exception as e:
+                st.error(f"Erro crítico: {str(e)}")
+                st.exception(e)
+        elif periodo == "15 dias":
             try:
                 with st.spinner("Obtendo dados do Jira (Todos Boards e Sprints, 15 dias)..."):
                     all_data = fetch_all_15days(num_sprints)
@@ -0,0 +1,21 @@
+from src.utils.custom_llm import ChatDatabricks
+
+
+def _llm(**kwargs):
+    return ChatDatabricks(endpoint_url="http://127.0.0.1:1/serving-endpoints/x/invocations", token="t", **kwargs)
+
+
+def test_same_settings_share_session_and_semaphore():
+    first, second = _llm(max_concurrency=2), _llm(max_concurrency=2)
+
+    assert first._session() is second._session()
+    assert first._semaphore() is second._semaphore()
+
+
+def test_different_settings_do_not_inherit_the_first_instance():
+    small, large = _llm(max_concurrency=1, max_retries=0), _llm(max_concurrency=8, max_retries=5)
+
+    assert small._semaphore() is not large._semaphore()
+    assert large._semaphore()._value == 8
+    assert large._session().get_adapter("http://").max_retries.total == 5
+    assert small._session().get_adapter("http://").max_retries.total == 0
@@ -0,0 +1,63 @@
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+import uvicorn
+
+import src.agents.rework_agent as rework_agent
+import src.config.config as config
+from src.agents.rework_agent import _prepare_rework_frames, create_rework_agent, generate_rework_narrative
+from src.utils.rework_search import ReworkEventTable
+from tools.fake_databricks import create_app
+
+
+@pytest.fixture
+def fake_endpoint(monkeypatch):
+    """Model serving falso num servidor uvicorn local; aponta o agente para ele, sem cache de narrativas."""
+    app = create_app(latency=0, tokens=20)
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        assert time.monotonic() < deadline, "servidor falso não subiu"
+        time.sleep(0.01)
+    monkeypatch.setattr(config, "DATABRICKS_ENDPOINT", f"http://127.0.0.1:{port}/serving-endpoints/fake/invocations")
+    monkeypatch.setattr(config, "DATABRICKS_TOKEN", "token")
+    monkeypatch.setattr(rework_agent, "llm_cache", None)
+    yield app.state.stats
+    server.should_exit = True
+    thread.join(timeout=10)
+
+
+def _events():
+    ontem = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%dT%H:%M:%S.000-0300')
+    events = ReworkEventTable()
+    for card_key, status in (("P-1", "Reprovado"), ("P-1", "Em produção"), ("P-2", "Em produção")):
+        events.card_keys.append(card_key)
+        events.responsaveis.append("Ana")
+        events.desenvolvedores.append("Ana")
+        events.statuses.append(status)
+        events.datas.append(ontem)
+        events.sps.append(3)
+    return events
+
+
+def test_narrative_calls_the_endpoint(fake_endpoint):
+    narrative = generate_rework_narrative(_prepare_rework_frames(_events()))
+
+    assert fake_endpoint["requests"] == 1
+    assert len(narrative.split()) == 20
+
+
+def test_agent_returns_narrative_and_charts(fake_endpoint):
+    result = create_rework_agent(_events())
+
+    assert "error" not in result
+    assert fake_endpoint["requests"] == 1
+    assert result["charts_data"]["metrics"]["total_concluidos"] == 2
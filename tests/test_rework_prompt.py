@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+from src.agents.rework_agent import _prepare_rework_frames
+from src.agents.rework_prompt import build_developer_summary, build_rework_prompt_data
+from src.utils.rework_search import ReworkEventTable
+
+
+def _table(rows):
+    events = ReworkEventTable()
+    for card_key, responsavel, status, data_mudanca, sp in rows:
+        events.card_keys.append(card_key)
+        events.responsaveis.append(responsavel)
+        events.desenvolvedores.append(responsavel)
+        events.statuses.append(status)
+        events.datas.append(data_mudanca.strftime('%Y-%m-%dT%H:%M:%S.000-0300'))
+        events.sps.append(sp)
+    return events
+
+
+def test_summary_with_many_developers_and_no_conclusions():
+    # 127+ responsáveis só com reprovações: códigos int16 de um lado, grupo vazio (int8) do outro
+    ontem = datetime.now() - timedelta(days=1)
+    events = _table([(f"P-{i}", f"Dev {i}", "Reprovado", ontem, 3) for i in range(130)])
+    frames = _prepare_rework_frames(events)
+
+    summary = build_developer_summary(frames)
+
+    assert len(summary) == 130
+    assert summary['reprovacoes'].sum() == 130
+    assert summary['aprovacoes'].sum() == 0
+    assert build_rework_prompt_data(frames, token_budget=100_000)["total_reprovas"] == 130
+
+
+def test_summary_with_many_developers_and_no_rejections():
+    ontem = datetime.now() - timedelta(days=1)
+    events = _table([(f"P-{i}", f"Dev {i}", "Em produção", ontem, 2) for i in range(130)])
+
+    summary = build_developer_summary(_prepare_rework_frames(events))
+
+    assert summary['aprovacoes'].sum() == 130
+    assert summary['sp_entregues'].sum() == 260
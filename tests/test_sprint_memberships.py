@@ -0,0 +1,62 @@
+from datetime import date
+
+from src.utils.event_store import ReworkEventStore
+from src.utils.rework_aggregates import ReworkAggregateStore
+from src.utils.rework_search import ReworkEventTable
+
+
+def _table(*card_keys):
+    events = ReworkEventTable()
+    for card_key in card_keys:
+        events.card_keys.append(card_key)
+        events.responsaveis.append("Ana")
+        events.desenvolvedores.append("Ana")
+        events.statuses.append("Reprovado")
+        events.datas.append("2026-10-01T10:00:00.000-0300")
+        events.sps.append(3)
+    return events
+
+
+def _reprovas(aggregates, sprint_id):
+    return aggregates.metrics(date(2026, 10, 1), date(2026, 10, 1), sprint_ids=[sprint_id])["total_reprovas"]
+
+
+def _record(store, aggregates, events, memberships, crawled_sprints):
+    store.replace_issues(events, memberships, crawled_sprints)
+    aggregates.ingest(events, memberships, crawled_sprints=crawled_sprints)
+
+
+def test_crawl_unlinks_issues_that_left_the_sprint(tmp_path):
+    store, aggregates = ReworkEventStore(str(tmp_path / "events.sqlite3")), ReworkAggregateStore()
+    _record(store, aggregates, _table("A-1", "A-2"), [("A-1", "1"), ("A-2", "1")], ["1"])
+
+    # A-2 saiu da sprint 1 e foi para a 2
+    _record(store, aggregates, _table("A-1"), [("A-1", "1")], ["1"])
+    _record(store, aggregates, _table("A-2"), [("A-2", "2")], ["2"])
+
+    assert store.sprints_of("A-2") == ["2"]
+    assert _reprovas(aggregates, "1") == 1
+    assert _reprovas(aggregates, "2") == 1
+
+
+def test_partial_crawl_keeps_other_memberships(tmp_path):
+    store, aggregates = ReworkEventStore(str(tmp_path / "events.sqlite3")), ReworkAggregateStore()
+    _record(store, aggregates, _table("A-1", "A-2"), [("A-1", "1"), ("A-2", "1")], ["1"])
+
+    # Crawl de um board só de uma sprint compartilhada: não prova que A-2 saiu
+    _record(store, aggregates, _table("A-1"), [("A-1", "1")], [])
+
+    assert store.sprints_of("A-2") == ["1"]
+    assert _reprovas(aggregates, "1") == 2
+
+
+def test_webhook_sprints_replace_the_known_ones(tmp_path):
+    store, aggregates = ReworkEventStore(str(tmp_path / "events.sqlite3")), ReworkAggregateStore()
+    _record(store, aggregates, _table("A-1"), [("A-1", "1")], ["1"])
+
+    inserted = store.append(ReworkEventTable(), [("A-1", "2")], exact_memberships=True)
+    aggregates.ingest(inserted, [("A-1", "2")], replace=False, exact_memberships=True)
+
+    assert store.sprints_of("A-1") == ["2"]
+    assert _reprovas(aggregates, "1") == 0
+    assert _reprovas(aggregates, "2") == 1
@@ -0,0 +1,92 @@
+"""
+Endpoint local que imita o model serving do Databricks (API compatível com
+OpenAI), para testes de carga e benchmarks sem custo de inferência.
+
+Uso:
+    python -m tools.fake_databricks --port 8081 --latency 0.5 --tokens 200 --error-rate 0.1
+
+E aponte a aplicação para ele:
+    DATABRICKS_ENDPOINT=http://127.0.0.1:8081/serving-endpoints/fake/invocations
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORDS = ["retrabalho", "sprint", "reprovação", "desenvolvedor", "entrega", "qualidade", "fluxo", "card"]
+
+
+def create_app(latency: float = 0.5, tokens: int = 200, token_delay: float = 0.0, error_rate: float = 0.0) -> FastAPI:
+    """
+    latency: espera (s) antes da primeira resposta; tokens: tamanho da resposta;
+    token_delay: intervalo entre tokens no modo stream; error_rate: fração de
+    requisições respondidas com 429 (com Retry-After) para exercitar o retry.
+    """
+    app = FastAPI()
+    app.state.stats = {"requests": 0, "rejected": 0, "in_flight": 0, "max_in_flight": 0}
+
+    @app.post("/serving-endpoints/{name}/invocations")
+    async def invocations(name: str, request: Request):
+        stats = app.state.stats
+        stats["requests"] += 1
+        body = await request.json()
+        if random.random() < error_rate:
+            stats["rejected"] += 1
+            return JSONResponse({"error_code": "REQUEST_LIMIT_EXCEEDED"}, status_code=429, headers={"Retry-After": "1"})
+
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(latency)
+            words = [random.choice(WORDS) for _ in range(tokens)]
+        finally:
+            if not body.get("stream"):
+                stats["in_flight"] -= 1
+
+        if not body.get("stream"):
+            return {
+                "id": f"fake-{time.time_ns()}",
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": " ".join(words)}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(json.dumps(body["messages"])) // 4, "completion_tokens": tokens},
+            }
+
+        async def sse():
+            try:
+                for word in words:
+                    chunk = {"object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"content": word + " "}}]}
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    if token_delay:
+                        await asyncio.sleep(token_delay)
+                yield "data: [DONE]\n\n"
+            finally:
+                stats["in_flight"] -= 1
+
+        return StreamingResponse(sse(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def get_stats():
+        return app.state.stats
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.latency, args.tokens, args.token_delay, args.error_rate),
+        host=args.host, port=args.port, log_level="warning"
+    )
@@ -0,0 +1,200 @@
+"""
+Servidor local que imita as APIs agile/REST do Jira usadas pelo JiraClient
+(boards, sprints, issues de board/sprint, busca JQL com changelog e changelog
+paginado), com dados sintéticos determinísticos, para benchmarks e testes de
+carga sem tocar no Jira real.
+
+Uso:
+    python -m tools.fake_jira --port 8082 --boards 50 --sprints 500 --issues 20000 --latency 0.02
+
+E aponte a aplicação para ele:
+    BASE_URL=http://127.0.0.1:8082
+"""
+import argparse
+import asyncio
+import random
+import re
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import FastAPI, Request
+
+DEVS = [f"Dev {n}" for n in range(40)]
+STATUSES = ["Em andamento", "Code Review", "Reprovado", "Em Homologação", "Em release", "Em produção"]
+HISTORY_PAGE = 100
+_KEY_RE = re.compile(r"PRJ-(\d+)")
+
+
+def _jira_date(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}-0300"
+
+
+def create_app(
+    boards: int = 50,
+    sprints: int = 500,
+    issues: int = 20000,
+    histories: int = 8,
+    items: int = 2,
+    padding: int = 0,
+    latency: float = 0.0
+) -> FastAPI:
+    """
+    boards/sprints/issues: volume total (sprints e issues divididos igualmente);
+    histories/items: tamanho do changelog de cada issue; padding: bytes extras
+    na descrição de cada issue; latency: espera (s) antes de cada resposta.
+    """
+    app = FastAPI()
+    app.state.stats = {"requests": 0, "by_endpoint": {}}
+    now = datetime.now().replace(microsecond=0)
+    issues_per_sprint = max(1, issues // max(1, sprints))
+    description = "x" * padding
+
+    def sprint_board(sprint_id: int) -> int:
+        return (sprint_id - 1) % boards + 1
+
+    def board_sprints(board_id: int) -> list:
+        ids = range(board_id, sprints + 1, boards)
+        last = ids[-1] if len(ids) else None
+        result = []
+        for sprint_id in ids:
+            # Sprints mais novas têm id maior; a última de cada board está ativa
+            start = now - timedelta(days=14 * ((sprints - sprint_id) // boards + 1))
+            result.append({
+                "id": sprint_id,
+                "name": f"Sprint {sprint_id}",
+                "state": "active" if sprint_id == last else "closed",
+                "startDate": start.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "endDate": (start + timedelta(days=14)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "originBoardId": board_id,
+            })
+        return result
+
+    def issue_histories(index: int) -> list:
+        rng = random.Random(f"hist-{index}")
+        moments = sorted(now - timedelta(minutes=rng.randint(0, 60 * 24 * 30)) for _ in range(histories))
+        return [
+            {
+                "id": str(index * 1000 + n),
+                "created": _jira_date(moment),
+                "items": [{"field": "status", "fieldtype": "jira", "toString": rng.choice(STATUSES)} for _ in range(items)],
+            }
+            for n, moment in enumerate(moments)
+        ]
+
+    def issue_fields(index: int) -> dict:
+        rng = random.Random(f"issue-{index}")
+        dev = rng.choice(DEVS)
+        fields = {
+            "customfield_10106": float(rng.choice([1, 2, 3, 5, 8])),
+            "customfield_10172": {"value": dev},
+            "assignee": {"displayName": dev},
+            "status": {"name": rng.choice(STATUSES)},
+            "created": _jira_date(now - timedelta(days=40)),
+            "updated": _jira_date(now - timedelta(minutes=index % 997)),
+        }
+        if description:
+            fields["description"] = description
+        return fields
+
+    def issue_with_changelog(index: int) -> dict:
+        full = issue_histories(index)
+        return {
+            "id": str(10000 + index),
+            "key": f"PRJ-{index}",
+            "fields": {"updated": issue_fields(index)["updated"]},
+            "changelog": {"startAt": 0, "maxResults": HISTORY_PAGE, "total": len(full), "histories": full[:HISTORY_PAGE]},
+        }
+
+    def page(values: list, start_at: int, max_results: int) -> dict:
+        chunk = values[start_at:start_at + max_results]
+        return {
+            "startAt": start_at,
+            "maxResults": max_results,
+            "total": len(values),
+            "isLast": start_at + len(chunk) >= len(values),
+            "values": chunk,
+        }
+
+    @app.middleware("http")
+    async def count_and_delay(request: Request, call_next):
+        if request.url.path == "/stats":
+            return await call_next(request)
+        stats = app.state.stats
+        stats["requests"] += 1
+        endpoint = re.sub(r"/(board|sprint|issue)/[^/]+", r"/\1/{id}", request.url.path)
+        stats["by_endpoint"][endpoint] = stats["by_endpoint"].get(endpoint, 0) + 1
+        if latency:
+            await asyncio.sleep(latency)
+        return await call_next(request)
+
+    @app.get("/rest/agile/1.0/board")
+    async def get_boards(startAt: int = 0, maxResults: int = 50):
+        values = [{"id": b, "name": f"Board {b}", "type": "scrum"} for b in range(1, boards + 1)]
+        return page(values, startAt, maxResults)
+
+    @app.get("/rest/agile/1.0/board/{board_id}/sprint")
+    async def get_sprints(board_id: int, startAt: int = 0, maxResults: int = 50, state: Optional[str] = None):
+        values = board_sprints(board_id)
+        if state:
+            states = set(state.split(","))
+            values = [s for s in values if s["state"] in states]
+        return page(values, startAt, maxResults)
+
+    @app.get("/rest/agile/1.0/board/{board_id}/sprint/{sprint_id}/issue")
+    async def get_sprint_issues(board_id: int, sprint_id: int, startAt: int = 0, maxResults: int = 50):
+        indexes = []
+        if sprint_board(sprint_id) == board_id and sprint_id <= sprints:
+            first = (sprint_id - 1) * issues_per_sprint
+            indexes = range(first, min(first + issues_per_sprint, issues))
+        chunk = indexes[startAt:startAt + maxResults]
+        return {
+            "startAt": startAt,
+            "maxResults": maxResults,
+            "total": len(indexes),
+            "issues": [{"id": str(10000 + i), "key": f"PRJ-{i}", "fields": issue_fields(i)} for i in chunk],
+        }
+
+    @app.get("/rest/api/2/search")
+    async def search(jql: str, startAt: int = 0, maxResults: int = 50):
+        indexes = [int(n) for n in _KEY_RE.findall(jql) if int(n) < issues]
+        chunk = indexes[startAt:startAt + maxResults]
+        return {
+            "startAt": startAt,
+            "maxResults": maxResults,
+            "total": len(indexes),
+            "issues": [issue_with_changelog(i) for i in chunk],
+        }
+
+    @app.get("/rest/api/2/issue/{issue_key}")
+    async def get_issue(issue_key: str):
+        return issue_with_changelog(int(issue_key.split("-")[1]))
+
+    @app.get("/rest/api/2/issue/{issue_key}/changelog")
+    async def get_changelog(issue_key: str, startAt: int = 0, maxResults: int = HISTORY_PAGE):
+        return page(issue_histories(int(issue_key.split("-")[1])), startAt, maxResults)
+
+    @app.get("/stats")
+    async def get_stats():
+        return app.state.stats
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--boards", type=int, default=50)
+    parser.add_argument("--sprints", type=int, default=500)
+    parser.add_argument("--issues", type=int, default=20000)
+    parser.add_argument("--histories", type=int, default=8)
+    parser.add_argument("--items", type=int, default=2)
+    parser.add_argument("--padding", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.boards, args.sprints, args.issues, args.histories, args.items, args.padding, args.latency),
+        host=args.host, port=args.port, log_level="warning"
+    )
@@ -0,0 +1,33 @@
+"""
+Inspeciona um arquivo de respostas do Jira gravado com JIRA_MODE=record.
+
+Uso:
+    python -m tools.jira_archive list .cache/jira_archive.jsonl.gz
+    python -m tools.jira_archive show .cache/jira_archive.jsonl.gz "GET /rest/agile/1.0/board?maxResults=50&startAt=0"
+"""
+import argparse
+import json
+
+from src.utils.jira_archive import JiraArchive
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["list", "show"])
+    parser.add_argument("path")
+    parser.add_argument("key", nargs="?", help="Chave da requisição (para `show`)")
+    args = parser.parse_args()
+
+    records = JiraArchive(args.path).load()
+    if args.command == "list":
+        for key, record in records.items():
+            print(f"{record['status']}  {len(record['body']):>9}  {key}")
+        print(f"{len(records)} respostas")
+    else:
+        record = records.get(args.key)
+        if record is None:
+            parser.error(f"requisição não gravada: {args.key}")
+        try:
+            print(json.dumps(json.loads(record["body"]), indent=2, ensure_ascii=False))
+        except ValueError:
+            print(record["body"])
@@ -0,0 +1,68 @@
+"""
+Teste de carga do ChatDatabricks assíncrono contra um endpoint (ex.: o
+tools.fake_databricks). Dispara `--requests` chamadas com `--concurrency`
+tarefas simultâneas e reporta latências, erros e vazão.
+
+Uso:
+    python -m tools.load_test_llm --url http://127.0.0.1:8081/serving-endpoints/fake/invocations \
+        --requests 200 --concurrency 50 --max-in-flight 8
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from src.utils.custom_llm import ChatDatabricks
+
+
+async def run(url: str, total: int, concurrency: int, max_in_flight: int, read_timeout: float) -> dict:
+    llm = ChatDatabricks(
+        endpoint_url=url,
+        token="fake",
+        max_tokens=256,
+        max_concurrency=max_in_flight,
+        read_timeout=read_timeout,
+    )
+    latencies = []
+    errors = []
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                await llm.ainvoke("Resuma o retrabalho da sprint.")
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(type(e).__name__)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": total,
+        "ok": len(latencies),
+        "errors": len(errors),
+        "wall_time_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_p50_s": round(statistics.median(latencies), 3) if latencies else None,
+        "latency_p95_s": round(latencies[int(len(latencies) * 0.95) - 1], 3) if latencies else None,
+        "latency_max_s": round(latencies[-1], 3) if latencies else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--max-in-flight", type=int, default=4)
+    parser.add_argument("--read-timeout", type=float, default=60.0)
+    args = parser.parse_args()
+    result = asyncio.run(run(args.url, args.requests, args.concurrency, args.max_in_flight, args.read_timeout))
+    print(json.dumps(result, indent=2))
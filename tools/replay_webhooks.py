@@ -0,0 +1,89 @@
+"""
+Reenvia webhooks do Jira gravados em JSON (um payload por arquivo `.json` ou
+um por linha em `.jsonl`) para o `POST /webhooks/jira`, para testar a ingestão
+localmente. Com `--in-process` usa a app FastAPI direto (TestClient), sem
+subir o servidor, gravando num armazenamento de eventos temporário (a menos
+que EVENT_STORE_PATH esteja definido no ambiente). Com `--secret`, assina o
+corpo como o Jira (X-Hub-Signature).
+
+Uso:
+    python -m tools.replay_webhooks tools/fixtures/webhooks
+    python -m tools.replay_webhooks tools/fixtures/webhooks --url http://127.0.0.1:8000/webhooks/jira --delay 0.2
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import tempfile
+import time
+from typing import Iterator, List
+
+
+def iter_payloads(paths: List[str]) -> Iterator[dict]:
+    """Payloads dos arquivos/diretórios informados, em ordem alfabética dentro de cada diretório."""
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.endswith((".json", ".jsonl"))
+            )
+        else:
+            files = [path]
+        for file_path in files:
+            with open(file_path, encoding="utf-8") as f:
+                if file_path.endswith(".jsonl"):
+                    for line in f:
+                        if line.strip():
+                            yield json.loads(line)
+                else:
+                    yield json.load(f)
+
+
+def _headers(body: bytes, secret: str) -> dict:
+    headers = {"Content-Type": "application/json"}
+    if secret:
+        headers["X-Hub-Signature"] = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return headers
+
+
+def replay(paths: List[str], url: str, secret: str = "", delay: float = 0.0, in_process: bool = False) -> dict:
+    result = {}
+    if in_process:
+        # Não grava no armazenamento real (.cache) do serviço; precisa vir antes de importar a config
+        if "EVENT_STORE_PATH" not in os.environ:
+            os.environ["EVENT_STORE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="replay_webhooks_"), "rework_events.sqlite3")
+        result["event_store"] = os.environ["EVENT_STORE_PATH"]
+        from fastapi.testclient import TestClient
+        from src.api.app import app
+        client = TestClient(app)
+        url = "/webhooks/jira"
+        post = client.post
+    else:
+        import requests
+        post = requests.Session().post
+
+    sent, events, failures = 0, 0, []
+    for payload in iter_payloads(paths):
+        body = json.dumps(payload).encode()
+        response = post(url, content=body, headers=_headers(body, secret)) if in_process else \
+            post(url, data=body, headers=_headers(body, secret), timeout=30)
+        sent += 1
+        if response.status_code == 200:
+            events += response.json().get("events", 0)
+        else:
+            failures.append({"issue": payload.get("issue", {}).get("key"), "status": response.status_code, "detail": response.text})
+        if delay:
+            time.sleep(delay)
+    return {"sent": sent, "events_stored": events, "failures": failures, **result}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="Arquivos .json/.jsonl ou diretórios com eles")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/webhooks/jira")
+    parser.add_argument("--secret", default=os.getenv("JIRA_WEBHOOK_SECRET", ""))
+    parser.add_argument("--delay", type=float, default=0.0, help="Pausa (segundos) entre os envios")
+    parser.add_argument("--in-process", action="store_true", help="Usa a app FastAPI direto, sem servidor")
+    args = parser.parse_args()
+    print(json.dumps(replay(args.paths, args.url, args.secret, args.delay, args.in_process), indent=2, ensure_ascii=False))